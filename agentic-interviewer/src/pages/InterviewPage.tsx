@@ -4,6 +4,19 @@ import { useNavigate } from "react-router-dom";
 import { useFullscreen } from "../hooks/useFullscreen";
 import { useTavusAvatar, type AvatarUtterance } from "../hooks/useTavusAvatar";
 import { apiUrl, wsUrl } from "../config";
+import {
+  DEFAULT_CAPTURE,
+  parseCaptureMessage,
+  sizeCaptureCanvas,
+} from "../utils/capture.utils";
+import {
+  EVENT_FLUSH_INTERVAL_MS,
+  MAX_BUFFERED_EVENTS,
+  createClientId,
+  sendEventBatch,
+} from "../utils/proctoring.utils";
+import { CODE_REVISION_INTERVAL_MS, sendCodeRevision } from "../utils/code.utils";
+import type { BrowserEvent } from "../types/api.types";
 import {
   Video,
   VideoOff,
@@ -51,6 +64,8 @@ const InterviewPage: React.FC = () => {
   const canvasRef = useRef<HTMLCanvasElement | null>(null);
   const transcriptEndRef = useRef<HTMLDivElement | null>(null);
   const videoWsRef = useRef<WebSocket | null>(null);
+  // Capture interval and width for the camera stream, as last set by the server.
+  const captureRef = useRef(DEFAULT_CAPTURE);
   const chatWsRef = useRef<WebSocket | null>(null);
   const audioContextRef = useRef<AudioContext | null>(null);
   const recognitionRef = useRef<SpeechRecognition | null>(null);
@@ -67,21 +82,42 @@ const InterviewPage: React.FC = () => {
   // nothing server-side can see them. These were previously counted into
   // React state, shown once in the exit dialog and lost on unmount.
   //
-  // Fire-and-forget: an interview must never break because telemetry failed,
-  // so every call swallows its own errors. `keepalive` lets the last event
-  // survive the page transition out of the interview.
+  // Events are buffered and sent in batches every few seconds rather than one
+  // request each, and whatever is left goes out with sendBeacon when the page
+  // is hidden or unloaded. Each carries a sequence number so a batch can be
+  // resent (after a failed fetch, or by both fetch and beacon) without being
+  // counted twice. An interview must never break because telemetry failed,
+  // so nothing here throws.
+  const clientIdRef = useRef(createClientId());
+  const eventSeqRef = useRef(0);
+  const pendingEventsRef = useRef<BrowserEvent[]>([]);
+
+  const flushEvents = useCallback(async (beacon = false) => {
+    const sessionId = sessionStorage.getItem("sessionId");
+    const batch = pendingEventsRef.current;
+    if (!sessionId || batch.length === 0) return;
+    pendingEventsRef.current = [];
+    const sent = await sendEventBatch(sessionId, clientIdRef.current, batch, beacon);
+    if (!sent) {
+      // Back in front of anything queued since, for the next flush.
+      pendingEventsRef.current = [...batch, ...pendingEventsRef.current];
+    }
+  }, []);
+
   const reportEvent = useCallback(
-    (type: string, detail: Record<string, number | string> = {}) => {
-      const sessionId = sessionStorage.getItem("sessionId");
-      if (!sessionId) return;
-      fetch(apiUrl("/api/interview/event"), {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ session_id: sessionId, type, ...detail }),
-        keepalive: true,
-      }).catch(() => {});
+    (type: string, detail: Omit<Partial<BrowserEvent>, "seq" | "type" | "at"> = {}) => {
+      eventSeqRef.current += 1;
+      pendingEventsRef.current.push({
+        seq: eventSeqRef.current,
+        type,
+        at: Date.now(),
+        ...detail,
+      });
+      if (pendingEventsRef.current.length >= MAX_BUFFERED_EVENTS) {
+        void flushEvents();
+      }
     },
-    []
+    [flushEvents]
   );
 
   // Keystrokes are counted, not logged individually: a 45-minute interview
@@ -118,6 +154,33 @@ const InterviewPage: React.FC = () => {
   // editing it underneath them would make their hint refer to code that no
   // longer exists.
   const [codeLocked, setCodeLocked] = useState(false);
+
+  // How the solution was written, not just what was submitted: while the
+  // editor is open its contents go to the backend every few seconds as a
+  // delta against the last revision it acknowledged. `full` asks for the
+  // whole text instead - the first time, and after the backend reports it
+  // missed a revision.
+  const codeRef = useRef("");
+  useEffect(() => {
+    codeRef.current = code;
+  }, [code]);
+  const codeSentRef = useRef({ text: "", rev: 0, full: true, inFlight: false });
+  const flushCodeRevision = useCallback(async () => {
+    const sessionId = sessionStorage.getItem("sessionId");
+    const sent = codeSentRef.current;
+    const text = codeRef.current;
+    if (!sessionId || sent.inFlight || text === sent.text) return;
+    sent.inFlight = true;
+    const reply = await sendCodeRevision(sessionId, sent.text, text, sent.rev, sent.full);
+    sent.inFlight = false;
+    if (reply?.status === "recorded") {
+      codeSentRef.current = { text, rev: reply.rev ?? sent.rev + 1, full: false, inFlight: false };
+    } else if (reply?.status === "resync") {
+      sent.full = true;
+      sent.rev = reply.rev ?? sent.rev;
+    }
+    // Rate-limited or unreachable: the next flush sends the combined delta.
+  }, []);
   // The interviewer has delivered its closing line. The prompt to finish is
   // dismissible because that closing invites final questions — the candidate
   // may still want to speak before leaving.
@@ -335,6 +398,11 @@ const InterviewPage: React.FC = () => {
     };
 
     ws.onmessage = (event: MessageEvent) => {
+      const capture = parseCaptureMessage(event.data);
+      if (capture) {
+        captureRef.current = capture;
+        return;
+      }
       if (event.data === "face_in_frame") {
         setFaceStatus("in_frame");
       } else if (event.data === "face_out_of_frame") {
@@ -380,15 +448,19 @@ const InterviewPage: React.FC = () => {
     chatWsRef.current = ws;
   };
 
-  // Capture and send video frames
+  // Capture and send video frames. A setTimeout chain rather than
+  // setInterval, so each frame picks up the interval the server most recently
+  // asked for: slower while the candidate sits still or the server is busy,
+  // faster around the moments they leave or return to the frame.
   useEffect(() => {
-    let interval: number;
-    if (videoWsRef.current && stream) {
-      interval = setInterval(() => {
-        captureAndSendFrame();
-      }, 500);
-    }
-    return () => clearInterval(interval);
+    if (!videoWsRef.current || !stream) return;
+    let timer: number;
+    const tick = () => {
+      captureAndSendFrame();
+      timer = window.setTimeout(tick, captureRef.current.interval_ms);
+    };
+    timer = window.setTimeout(tick, captureRef.current.interval_ms);
+    return () => clearTimeout(timer);
   }, [stream]);
 
   const captureAndSendFrame = () => {
@@ -408,6 +480,7 @@ const InterviewPage: React.FC = () => {
 
     if (!ctx) return;
 
+    sizeCaptureCanvas(canvas, captureRef.current.width);
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
     canvas.toBlob(
       async (blob) => {
@@ -753,6 +826,8 @@ const InterviewPage: React.FC = () => {
 
     setIsSubmittingCode(true);
     try {
+      // The submitted text should be the last revision in the history too.
+      await flushCodeRevision();
       const sessionId = sessionStorage.getItem("sessionId");
       const response = await fetch(
         apiUrl("/api/interview/code/submit"),
@@ -862,23 +937,46 @@ const InterviewPage: React.FC = () => {
         // The candidate is leaving the page, so send any typing not yet
         // batched out - this is exactly when it would otherwise be lost.
         flushKeystrokes();
+        void flushEvents(true);
       }
     };
+    // pagehide, not unload: it also fires when the page goes into the
+    // back/forward cache, and a beacon sent from it is not cancelled.
+    const handlePageHide = () => {
+      flushKeystrokes();
+      void flushEvents(true);
+    };
     document.addEventListener("visibilitychange", handleVisibilityChange);
+    window.addEventListener("pagehide", handlePageHide);
     return () => {
       document.removeEventListener("visibilitychange", handleVisibilityChange);
+      window.removeEventListener("pagehide", handlePageHide);
     };
-  }, [reportEvent, flushKeystrokes]);
+  }, [reportEvent, flushKeystrokes, flushEvents]);
 
-  // Batch typing up to the backend while the interview runs, and once more on
-  // unmount so the last burst is not lost.
+  // Batch typing and events up to the backend while the interview runs, and
+  // once more on unmount so the last burst is not lost.
   useEffect(() => {
-    const id = setInterval(flushKeystrokes, 20000);
+    const keystrokes = setInterval(flushKeystrokes, 20000);
+    const events = setInterval(() => void flushEvents(), EVENT_FLUSH_INTERVAL_MS);
     return () => {
-      clearInterval(id);
+      clearInterval(keystrokes);
+      clearInterval(events);
       flushKeystrokes();
+      void flushEvents(true);
     };
-  }, [flushKeystrokes]);
+  }, [flushKeystrokes, flushEvents]);
+
+  // Editor revisions, only while the editor is open, and once more as it
+  // closes so the last edits before submitting are in the history.
+  useEffect(() => {
+    if (!showCodeEditor) return;
+    const id = setInterval(() => void flushCodeRevision(), CODE_REVISION_INTERVAL_MS);
+    return () => {
+      clearInterval(id);
+      void flushCodeRevision();
+    };
+  }, [showCodeEditor, flushCodeRevision]);
 
   // Prevent shortcuts
   useEffect(() => {
@@ -914,6 +1012,11 @@ const InterviewPage: React.FC = () => {
     if (!sessionId || endRequestedRef.current) return;
     endRequestedRef.current = true;
 
+    // The backend saves the proctoring log as part of ending, so anything
+    // still buffered here has to land first.
+    flushKeystrokes();
+    await flushEvents();
+
     try {
       const response = await fetch(apiUrl("/api/interview/end"), {
         method: "POST",
@@ -930,7 +1033,7 @@ const InterviewPage: React.FC = () => {
       endRequestedRef.current = false;
       console.error("Failed to end interview cleanly:", error);
     }
-  }, []);
+  }, [flushKeystrokes, flushEvents]);
 
   // The brief wait between clicking "End" and landing on the results page,
   // while the backend tears the call down. Presentation only — it drives the
@@ -1,5 +1,5 @@
 // src/pages/LandingPage.tsx
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import { Loader2 } from "lucide-react";
 import {
@@ -73,6 +73,12 @@ function LandingPage() {
   const [error, setError] = useState("");
   const [isLoading, setIsLoading] = useState(false);
 
+  // One nonce per visit to this page. A double-click or a retry after a
+  // network error sends the same nonce with the same resume and job
+  // description, and the backend answers with the session it already
+  // started instead of paying for a second one.
+  const initNonceRef = useRef(crypto.randomUUID());
+
   // Custom role: the candidate supplies the job description themselves.
   const [customTitle, setCustomTitle] = useState("");
   const [customJd, setCustomJd] = useState("");
@@ -204,7 +210,8 @@ function LandingPage() {
       const response = await initializeSession({
         resume_base64: resumeBase64,
         job_description: jobDescription,
-        job_role: jobTitle
+        job_role: jobTitle,
+        client_nonce: initNonceRef.current
       });
 
       // Store session data
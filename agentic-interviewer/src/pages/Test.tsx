@@ -2,12 +2,19 @@ import React, { useRef, useState, useEffect } from "react";
 import { useNavigate } from "react-router-dom";
 import { wsUrl } from "../config";
 import FlowHeader from "../components/FlowHeader";
+import {
+  DEFAULT_CAPTURE,
+  parseCaptureMessage,
+  sizeCaptureCanvas,
+} from "../utils/capture.utils";
 
 const CameraCheck: React.FC = () => {
   const videoRef = useRef<HTMLVideoElement | null>(null);
   const canvasRef = useRef<HTMLCanvasElement | null>(null);
   const audioContextRef = useRef<AudioContext | null>(null);
   const analyserRef = useRef<AnalyserNode | null>(null);
+  // Capture interval and width, as last set by the server.
+  const captureRef = useRef(DEFAULT_CAPTURE);
 
   const [stream, setStream] = useState<MediaStream | null>(null);
   const [ws, setWs] = useState<WebSocket | null>(null);
@@ -119,6 +126,7 @@ const CameraCheck: React.FC = () => {
 
     if (!ctx) return;
 
+    sizeCaptureCanvas(canvas, captureRef.current.width);
     ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
     canvas.toBlob(async (blob) => {
       if (blob && ws.readyState === WebSocket.OPEN) {
@@ -137,7 +145,11 @@ const CameraCheck: React.FC = () => {
     };
 
     socket.onmessage = (event: MessageEvent) => {
-      console.log("Message from server:", event.data);
+      const capture = parseCaptureMessage(event.data);
+      if (capture) {
+        captureRef.current = capture;
+        return;
+      }
 
       if (event.data === "face_in_frame") {
         setFaceStatus("in_frame");
@@ -151,9 +163,16 @@ const CameraCheck: React.FC = () => {
       setError("Connection error. Please check if the server is running.");
     };
 
-    socket.onclose = () => {
+    socket.onclose = (event) => {
       console.log("WebSocket connection closed");
       setIsStreaming(false);
+      // 1013: too many camera checks running right now. The interview checks
+      // the camera again, so this one can be skipped.
+      if (event.code === 1013) {
+        setError(
+          "The camera check is busy right now. You can continue - your camera will be checked when the interview starts."
+        );
+      }
     };
 
     setWs(socket);
@@ -194,12 +213,17 @@ const CameraCheck: React.FC = () => {
     }
   }, [stream]);
 
+  // A setTimeout chain rather than setInterval, so each frame picks up the
+  // interval the server most recently asked for.
   useEffect(() => {
-    let interval: number;
-    if (isStreaming) {
-      interval = setInterval(captureAndSendFrame, 500);
-    }
-    return () => clearInterval(interval);
+    if (!isStreaming) return;
+    let timer: number;
+    const tick = () => {
+      captureAndSendFrame();
+      timer = window.setTimeout(tick, captureRef.current.interval_ms);
+    };
+    timer = window.setTimeout(tick, captureRef.current.interval_ms);
+    return () => clearTimeout(timer);
   }, [isStreaming, ws]);
 
   const handleProceed = () => {
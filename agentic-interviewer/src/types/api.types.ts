@@ -6,6 +6,22 @@ export interface SessionInitRequest {
   job_role: string;
   /** Optional fallback only — the backend reads the name off the resume. */
   candidate_name?: string;
+  /**
+   * Return as soon as the session id exists (status "initializing") and
+   * report the rest on GET /api/session/{session_id}/progress.
+   */
+  background?: boolean;
+  /**
+   * Token from POST /api/candidates/preregister. The resume was analysed
+   * ahead of time; resume_base64 and job_description may then be omitted.
+   */
+  interview_token?: string;
+  /**
+   * Kept for one upload attempt. Duplicate requests carrying the same nonce,
+   * resume and job description get the same session back instead of a new one.
+   */
+  client_nonce?: string;
+  idempotency_key?: string;
 }
 
 export interface SessionInitResponse {
@@ -33,4 +49,36 @@ export interface JobType {
 export interface ApiError {
   detail: string;
   status_code?: number;
-}
\ No newline at end of file
+}
+/**
+ * Sent by the server on /ws/video to set how often, and how large, the
+ * client captures camera frames.
+ */
+export interface CaptureSettings {
+  type: 'capture';
+  interval_ms: number;
+  width: number;
+}
+
+/**
+ * One browser-observed integrity event, as buffered by the interview page and
+ * sent in batches to /api/interview/events.
+ */
+export interface BrowserEvent {
+  /** Per page load, from 1; lets the backend drop resends. */
+  seq: number;
+  type: string;
+  /** Epoch milliseconds, client clock. */
+  at: number;
+  duration?: number;
+  chars?: number;
+  keystrokes?: number;
+  source?: string;
+}
+
+/** Reply to a code editor revision sent to /api/interview/code/revision. */
+export interface CodeRevisionReply {
+  /** "resync": the delta did not apply; send the whole text next time. */
+  status: 'recorded' | 'resync' | 'rate_limited' | 'ignored';
+  rev?: number;
+}
@@ -0,0 +1,47 @@
+// src/utils/capture.utils.ts
+import type { CaptureSettings } from '../types/api.types';
+
+/** What a camera stream uses until the server says otherwise. */
+export const DEFAULT_CAPTURE: CaptureSettings = {
+  type: 'capture',
+  interval_ms: 500,
+  width: 640,
+};
+
+// Never faster or slower than this, whatever the server asks for.
+const MIN_INTERVAL_MS = 100;
+const MAX_INTERVAL_MS = 5000;
+
+/**
+ * Parse a /ws/video text message as a capture-rate instruction.
+ * @param data - Raw message data
+ * @returns The settings, or null if the message is a face verdict or anything else
+ */
+export const parseCaptureMessage = (data: unknown): CaptureSettings | null => {
+  if (typeof data !== 'string' || !data.startsWith('{')) return null;
+  try {
+    const message = JSON.parse(data);
+    if (message?.type !== 'capture') return null;
+    return {
+      type: 'capture',
+      interval_ms: Math.min(
+        MAX_INTERVAL_MS,
+        Math.max(MIN_INTERVAL_MS, Number(message.interval_ms) || DEFAULT_CAPTURE.interval_ms)
+      ),
+      width: Number(message.width) || DEFAULT_CAPTURE.width,
+    };
+  } catch {
+    return null;
+  }
+};
+
+/**
+ * Size the capture canvas for the requested width, keeping 4:3.
+ * Only touches the canvas when the size actually changes - assigning width or
+ * height clears it and reallocates its backing store.
+ */
+export const sizeCaptureCanvas = (canvas: HTMLCanvasElement, width: number): void => {
+  const height = Math.round((width * 3) / 4);
+  if (canvas.width !== width) canvas.width = width;
+  if (canvas.height !== height) canvas.height = height;
+};
@@ -0,0 +1,68 @@
+// src/utils/code.utils.ts
+import { apiUrl } from '../config';
+import type { CodeRevisionReply } from '../types/api.types';
+
+/** How often the editor's contents are sent while the coding round is open. */
+export const CODE_REVISION_INTERVAL_MS = 3000;
+
+/**
+ * The single edit turning `prev` into `next`, from their common prefix and
+ * suffix: at `pos`, remove `remove` characters and insert `insert`. Typing
+ * between two snapshots is almost always one such splice, and a few bytes.
+ *
+ * Positions and counts are in code points, as the server's Python strings
+ * index them - not the UTF-16 units of a JS string, which would split an
+ * emoji in two and put every later splice in the wrong place. `length` is
+ * the length of `next`, so the server can tell when its copy has drifted.
+ */
+export const diffSplice = (
+  prev: string,
+  next: string
+): { pos: number; remove: number; insert: string; length: number } => {
+  const a = Array.from(prev);
+  const b = Array.from(next);
+  const limit = Math.min(a.length, b.length);
+  let start = 0;
+  while (start < limit && a[start] === b[start]) start += 1;
+  let end = 0;
+  while (
+    end < limit - start &&
+    a[a.length - 1 - end] === b[b.length - 1 - end]
+  ) {
+    end += 1;
+  }
+  return {
+    pos: start,
+    remove: a.length - start - end,
+    insert: b.slice(start, b.length - end).join(''),
+    length: b.length,
+  };
+};
+
+/**
+ * Send one editor revision to /api/interview/code/revision: a delta against
+ * revision `base`, or the whole text when `full`.
+ * @returns The server's reply, or null if it could not be reached. Never throws.
+ */
+export const sendCodeRevision = async (
+  sessionId: string,
+  prev: string,
+  next: string,
+  base: number,
+  full: boolean
+): Promise<CodeRevisionReply | null> => {
+  const body = full
+    ? { session_id: sessionId, base, text: next }
+    : { session_id: sessionId, base, ...diffSplice(prev, next) };
+  try {
+    const response = await fetch(apiUrl('/api/interview/code/revision'), {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body),
+      keepalive: true,
+    });
+    return response.ok ? ((await response.json()) as CodeRevisionReply) : null;
+  } catch {
+    return null;
+  }
+};
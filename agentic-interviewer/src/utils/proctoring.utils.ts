@@ -0,0 +1,60 @@
+// src/utils/proctoring.utils.ts
+import { apiUrl } from '../config';
+import type { BrowserEvent } from '../types/api.types';
+
+/** Flush the buffer early once it holds this many events. */
+export const MAX_BUFFERED_EVENTS = 50;
+
+/** How often buffered events go to the backend while the interview runs. */
+export const EVENT_FLUSH_INTERVAL_MS = 5000;
+
+/**
+ * A random id for this page load. Sequence numbers restart at 1 on reload, so
+ * the backend dedups on (client, seq), not seq alone.
+ */
+export const createClientId = (): string =>
+  typeof crypto !== 'undefined' && 'randomUUID' in crypto
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
+/**
+ * Send a batch of integrity events to /api/interview/events.
+ *
+ * With `beacon`, uses navigator.sendBeacon - the only send that reliably
+ * survives the page being hidden or unloaded. Its body goes as text/plain,
+ * which the endpoint accepts and which needs no CORS preflight.
+ *
+ * @returns Whether the batch was handed off (beacon) or accepted (fetch).
+ *          Never throws: telemetry must not break the interview.
+ */
+export const sendEventBatch = async (
+  sessionId: string,
+  client: string,
+  events: BrowserEvent[],
+  beacon = false
+): Promise<boolean> => {
+  if (events.length === 0) return true;
+  const body = JSON.stringify({
+    session_id: sessionId,
+    client,
+    sent_at: Date.now(),
+    events,
+  });
+  const url = apiUrl('/api/interview/events');
+
+  if (beacon && typeof navigator !== 'undefined' && navigator.sendBeacon) {
+    if (navigator.sendBeacon(url, body)) return true;
+    // Queue full (beacons are capped at ~64 KB in flight): fall through.
+  }
+  try {
+    const response = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'text/plain' },
+      body,
+      keepalive: true,
+    });
+    return response.ok;
+  } catch {
+    return false;
+  }
+};
@@ -0,0 +1,201 @@
+"""
+The coding round as it was written, not only as it was submitted.
+
+Integrity data for the editor used to be a running keystroke count and a
+paste count, and the report's only derived signal was their ratio. Neither
+says how the solution came to be: typed steadily over ten minutes, or
+arriving in one block after a long silence.
+
+The page now sends the editor's contents every few seconds as a delta
+against what it sent last - one splice, (position, characters removed, text
+inserted), found by trimming the common prefix and suffix. Positions and
+counts are in code points on both sides - what a Python str indexes by, not
+the UTF-16 units of a JavaScript string - and each delta carries the length
+the text should have afterwards, so any drift between the two copies is
+caught at once rather than corrupting every later splice. Typing produces
+deltas of a few characters, so a whole round is a few KB. Each revision is
+appended to logs/<session_id>/code_revisions.jsonl through the same buffered
+writer as the proctoring journal; in memory the server keeps only the
+current text and running totals. The full history - the length of the code
+over time, or the exact text at any revision - is rebuilt by replaying the
+file when a reviewer asks for it.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import config
+from agents.proctoring import journal
+
+
+REVISIONS_NAME = "code_revisions.jsonl"
+
+# Larger than any interview solution; past it a revision is refused.
+MAX_CODE_CHARS = 100_000
+
+# An insertion this large in one revision is called out in the report.
+LARGE_INSERT_CHARS = 200
+
+
+def splice(old: str, new: str) -> Tuple[int, int, str]:
+    """
+    The single edit turning `old` into `new`: (position, characters
+    removed, text inserted), from the common prefix and suffix.
+    """
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    return start, len(old) - start - end, new[start:len(new) - end]
+
+
+class CodeRevisionLog:
+    """The current editor text for one session, and its revision history on disk."""
+
+    def __init__(self, session_id: Optional[str] = None, journaled: bool = True):
+        self.session_id = session_id
+        self._path: Optional[Path] = (
+            config.logs_dir / session_id / REVISIONS_NAME
+            if session_id and journaled else None
+        )
+        self.text = ""
+        self.rev = 0
+        # Running totals, for the summary.
+        self.inserted = 0
+        self.removed = 0
+        self.largest_insert = 0
+        self.largest_insert_at: Optional[float] = None
+        self.first_at: Optional[float] = None
+        self.last_at: Optional[float] = None
+
+    # ---- recording ------------------------------------------------------
+
+    def apply(
+        self, base: int, at: float, pos: int, remove: int, insert: str,
+        length: Optional[int] = None,
+    ) -> bool:
+        """
+        Apply one delta made against revision `base`. `length`, when given,
+        is the length the client's text has after it.
+
+        Returns:
+            False if `base` is not the current revision, the delta does not
+            fit the text, or the result is not `length` long - the copies
+            have drifted, and the client should send the whole text instead
+            (see snapshot()).
+        """
+        if base != self.rev or pos < 0 or remove < 0 or pos + remove > len(self.text):
+            return False
+        new_length = len(self.text) - remove + len(insert)
+        if new_length > MAX_CODE_CHARS or (length is not None and length != new_length):
+            return False
+        self.text = self.text[:pos] + insert + self.text[pos + remove:]
+        self._count(at, remove, len(insert))
+        self._write({"rev": self.rev, "at": at, "pos": pos, "del": remove, "ins": insert})
+        return True
+
+    def snapshot(self, at: float, text: str) -> bool:
+        """Replace the text outright: the first revision, or after a resync."""
+        if len(text) > MAX_CODE_CHARS:
+            return False
+        _, remove, insert = splice(self.text, text)
+        self.text = text
+        self._count(at, remove, len(insert))
+        self._write({"rev": self.rev, "at": at, "text": text})
+        return True
+
+    def _count(self, at: float, removed: int, inserted: int) -> None:
+        self.rev += 1
+        self.removed += removed
+        self.inserted += inserted
+        if inserted > self.largest_insert:
+            self.largest_insert, self.largest_insert_at = inserted, at
+        self.first_at = at if self.first_at is None else self.first_at
+        self.last_at = at
+
+    def _write(self, line: Dict[str, Any]) -> None:
+        if self._path is not None:
+            journal.write(self._path, line)
+
+    # ---- reading --------------------------------------------------------
+
+    def summary(self) -> Dict[str, Any]:
+        span = (self.last_at - self.first_at) if self.first_at is not None else 0.0
+        return {
+            "revisions": self.rev,
+            "final_chars": len(self.text),
+            "chars_inserted": self.inserted,
+            "chars_removed": self.removed,
+            "largest_insert_chars": self.largest_insert,
+            "largest_insert_after_seconds": (
+                round(self.largest_insert_at - self.first_at, 1)
+                if self.largest_insert_at is not None else None
+            ),
+            "editing_seconds": round(span, 1),
+        }
+
+    @classmethod
+    def replay(
+        cls, session_id: str, until_rev: Optional[int] = None
+    ) -> Tuple[Optional["CodeRevisionLog"], List[Dict[str, Any]]]:
+        """
+        Rebuild a session's editor history from its revision file.
+
+        Returns:
+            The log as of `until_rev` (default: the last revision), and one
+            point per revision - time, length, and characters inserted and
+            removed - for the timeline. (None, []) if nothing was recorded.
+        """
+        journal.flush()
+        path = config.logs_dir / session_id / REVISIONS_NAME
+        if not path.exists():
+            return None, []
+
+        log = cls(session_id, journaled=False)
+        points = []
+        with open(path, "r", encoding="utf-8") as f:
+            for raw in f:
+                # Checked before applying, so until_rev=0 is the empty text.
+                if until_rev is not None and log.rev >= until_rev:
+                    break
+                try:
+                    line = json.loads(raw)
+                except ValueError:
+                    continue
+                before = (log.inserted, log.removed)
+                if "text" in line:
+                    log.snapshot(line["at"], line["text"])
+                elif not log.apply(log.rev, line["at"], line["pos"], line["del"], line["ins"]):
+                    continue
+                points.append({
+                    "rev": log.rev,
+                    "at": line["at"],
+                    "chars": len(log.text),
+                    "inserted": log.inserted - before[0],
+                    "removed": log.removed - before[1],
+                })
+        return log, points
+
+
+def revisions_to_report_section(summary: Optional[Dict[str, Any]]) -> str:
+    """The editor history for the report prompt, or "" if none was recorded."""
+    if not summary or not summary.get("revisions"):
+        return ""
+    minutes = summary["editing_seconds"] / 60
+    lines = [
+        "How the code was written (editor snapshots every few seconds):",
+        f"- {summary['revisions']} revision(s) over {minutes:.1f} minute(s); "
+        f"{summary['chars_inserted']} characters added, "
+        f"{summary['chars_removed']} removed, {summary['final_chars']} at the end",
+    ]
+    largest = summary.get("largest_insert_chars", 0)
+    if largest >= LARGE_INSERT_CHARS:
+        lines.append(
+            f"- Largest single addition: {largest} characters at once, "
+            f"{summary['largest_insert_after_seconds']}s into editing"
+        )
+    return "\n".join(lines)
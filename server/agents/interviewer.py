@@ -76,9 +76,15 @@ class InterviewerAgent:
         # Scoring
         self.response_scores: List[int] = []
         
-    def start_interview(self) -> str:
+    def start_interview(self, greeting: Optional[str] = None) -> str:
         """
         Start the interview and get opening statement
+
+        Args:
+            greeting: An opening line rendered elsewhere (see
+                render_greeting). When given, no model call is made - the
+                greeting is only a hello, and with the avatar on, waiting for
+                Claude to write one held up the avatar's start.
         """
         self.start_time = datetime.now()
         # The greeting is not a question, so the counter stays at zero until
@@ -87,7 +93,10 @@ class InterviewerAgent:
         self.opening_stage = "awaiting_ack"
 
         print("🎤 Starting interview...")
-        
+
+        if greeting:
+            return self._record_opening(greeting)
+
         # Get opening statement
         system_prompt = get_interviewer_prompt(
             resume_analysis=self.resume_analysis,
@@ -120,8 +129,10 @@ class InterviewerAgent:
             }]
         )
         
-        opening = first_text(response)
-        
+        return self._record_opening(first_text(response))
+
+    def _record_opening(self, opening: str) -> str:
+        """Put the opening line in the transcript and the model's history."""
         # Log
         self.transcript.append({
             "type": "opening",
@@ -0,0 +1,319 @@
+"""
+Resume pre-registration
+
+Recruiters usually hold a candidate's resume days before the interview, yet
+every resume used to be read and analysed inside /api/session/init - three
+Claude calls on the candidate's critical path, and a burst of them whenever a
+cohort started at once. Pre-registration moves that work ahead of time: the
+resume and job description are submitted up front, a small worker queue runs
+ResumeEvaluatorAgent at its own pace, and the caller gets an interview token.
+Redeeming the token at session init then costs a file read.
+
+Everything lives on disk under config.preregister_dir, one JSON record per
+token, because the gap between registering and interviewing is measured in
+days - long enough to span any number of server restarts. Work that was
+still queued when the process stopped is picked up again at startup.
+"""
+
+import asyncio
+import json
+import re
+import secrets
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Set
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.settings import config
+from agents.resume_evaluator import ResumeEvaluatorAgent
+
+
+# Tokens are URL-safe base64. Anything else is rejected before it gets near a
+# path, so a token can never name a file outside the pre-registration dir.
+_TOKEN_RE = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+
+# Record states. "queued" and "processing" are both unfinished work as far as
+# a restart is concerned.
+QUEUED = "queued"
+PROCESSING = "processing"
+READY = "ready"
+FAILED = "failed"
+REDEEMED = "redeemed"
+
+# How long redeem() waits on an analysis still running. Three Claude calls
+# take well under this; past it, something is stuck and the caller is better
+# off told so than left hanging.
+REDEEM_WAIT_SECONDS = 300.0
+
+
+class PreRegistrationError(Exception):
+    """A token that cannot be redeemed, with a reason fit to show the caller."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class PreRegistrationQueue:
+    """Background resume analysis, keyed by interview token."""
+
+    def __init__(self, directory: Optional[Path] = None, workers: Optional[int] = None):
+        self.directory = Path(directory or config.preregister_dir)
+        self.workers = max(1, workers or config.interview.preregister_workers)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks = []
+        # Resolved when a token's analysis finishes, for redeemers that arrive
+        # while it is still running.
+        self._pending: Dict[str, asyncio.Future] = {}
+        # Tokens an init is redeeming right now. Claimed in memory before the
+        # first await, so two concurrent inits cannot both spend one token.
+        self._claimed: Set[str] = set()
+
+    # ---- lifecycle ------------------------------------------------------
+
+    async def start(self) -> None:
+        """Start the workers and re-queue anything a restart interrupted."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+        requeued = 0
+        for path in sorted(self.directory.glob("*.json")):
+            record = self._read(path.stem)
+            if record and record.get("status") in (QUEUED, PROCESSING):
+                self._enqueue(record["token"])
+                requeued += 1
+        if requeued:
+            print(f"📥 Re-queued {requeued} pre-registered resume(s)")
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---- submitting -----------------------------------------------------
+
+    async def submit(
+        self,
+        resume_base64: str,
+        job_description: str,
+        job_role: str,
+        candidate_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Queue a resume for analysis and return its new record."""
+        token = secrets.token_urlsafe(24)
+        record = {
+            "token": token,
+            "status": QUEUED,
+            "job_role": job_role,
+            "candidate_name": (candidate_name or "").strip(),
+            "submitted_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        # The PDF is kept apart from the record, and only until it has been
+        # read - the record is what outlives the analysis. Megabytes of
+        # base64, so written off the event loop.
+        await asyncio.to_thread(self._write_json, self._input_path(token), {
+            "resume_base64": resume_base64,
+            "job_description": job_description,
+        })
+        await asyncio.to_thread(self._write, record)
+        self._enqueue(token)
+        return record
+
+    # ---- reading --------------------------------------------------------
+
+    def status(self, token: str) -> Optional[Dict[str, Any]]:
+        """The record for a token, without the analysis itself."""
+        record = self._read(token)
+        if not record:
+            return None
+        return {k: v for k, v in record.items() if k != "result"}
+
+    async def redeem(self, token: str) -> Dict[str, Any]:
+        """
+        Claim a token and return its finished analysis, waiting for it if
+        still running.
+
+        The claim is taken before anything awaits, so a second redeemer of
+        the same token is turned away at once. It does not consume the
+        token: the caller ends it with mark_redeemed() once the session
+        exists, or release() if the init failed, so the candidate can retry.
+
+        Raises:
+            PreRegistrationError: unknown, failed, in-use or already-used token
+        """
+        if token in self._claimed:
+            raise PreRegistrationError(
+                "This interview token is already being used", status_code=409
+            )
+        self._claimed.add(token)
+        try:
+            return await self._redeem(token)
+        except BaseException:
+            self.release(token)
+            raise
+
+    async def _redeem(self, token: str) -> Dict[str, Any]:
+        # Registered before the record is read: if the analysis finishes in
+        # between, the worker's finally finds this future and resolves it,
+        # rather than finding nothing and leaving us to wait forever.
+        future = self._pending.get(token)
+        if future is None:
+            future = self._pending[token] = asyncio.get_running_loop().create_future()
+
+        record = await asyncio.to_thread(self._read, token)
+        if not record or record["status"] not in (QUEUED, PROCESSING):
+            # Nothing to wait for. Resolve rather than drop the future, so
+            # any other waiter that registered it wakes and re-reads too.
+            self._settle(token)
+        if not record:
+            raise PreRegistrationError("Unknown interview token", status_code=404)
+
+        if record["status"] in (QUEUED, PROCESSING):
+            try:
+                await asyncio.wait_for(asyncio.shield(future), REDEEM_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            record = await asyncio.to_thread(self._read, token) or record
+
+        if record["status"] == REDEEMED:
+            raise PreRegistrationError(
+                "This interview token has already been used", status_code=409
+            )
+        if record["status"] in (QUEUED, PROCESSING):
+            # Timed out, or the worker gave up without recording an outcome.
+            raise PreRegistrationError(
+                "Resume analysis did not finish - try again shortly", status_code=503
+            )
+        if record["status"] != READY:
+            raise PreRegistrationError(
+                f"Resume analysis failed: {record.get('error', 'unknown error')}",
+                status_code=422,
+            )
+        return record
+
+    def release(self, token: str) -> None:
+        """Give back a claim taken by redeem(); the token can be redeemed again."""
+        self._claimed.discard(token)
+
+    async def mark_redeemed(self, token: str, session_id: str) -> None:
+        """Spend a claimed token for good, on behalf of `session_id`."""
+        try:
+            record = await asyncio.to_thread(self._read, token)
+            if not record:
+                return
+            record["status"] = REDEEMED
+            record["session_id"] = session_id
+            record["redeemed_at"] = datetime.now().isoformat(timespec="seconds")
+            await asyncio.to_thread(self._write, record)
+        finally:
+            self.release(token)
+
+    # ---- work -----------------------------------------------------------
+
+    def _enqueue(self, token: str) -> None:
+        if self._queue is None:
+            raise RuntimeError("PreRegistrationQueue.start() has not been called")
+        self._queue.put_nowait(token)
+
+    async def _worker(self) -> None:
+        while True:
+            token = await self._queue.get()
+            try:
+                await self._process(token)
+            except Exception as e:
+                # _process records its own failures; this is a bug guard so a
+                # single bad record cannot stop the worker.
+                print(f"⚠️  Pre-registration worker error for {token[:8]}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, token: str) -> None:
+        try:
+            await self._analyse(token)
+        finally:
+            # Whatever happened - including a write that raised - anyone
+            # waiting in redeem() must wake up and re-read the record.
+            self._settle(token)
+
+    def _settle(self, token: str) -> None:
+        """Wake everyone waiting in redeem() on this token."""
+        future = self._pending.pop(token, None)
+        if future and not future.done():
+            future.set_result(None)
+
+    async def _analyse(self, token: str) -> None:
+        record = await asyncio.to_thread(self._read, token)
+        if not record or record.get("status") not in (QUEUED, PROCESSING):
+            return
+
+        record["status"] = PROCESSING
+        await asyncio.to_thread(self._write, record)
+
+        try:
+            inputs = await asyncio.to_thread(self._read_json, self._input_path(token))
+            result = await ResumeEvaluatorAgent().evaluate(
+                inputs["resume_base64"], inputs["job_description"]
+            )
+        except Exception as e:
+            print(f"❌ Pre-registered resume {token[:8]} failed: {e}")
+            record["status"] = FAILED
+            record["error"] = str(e)
+        else:
+            record["status"] = READY
+            record["result"] = {
+                key: result.get(key)
+                for key in (
+                    "analysis", "resume_text", "job_description", "model_used",
+                    "candidate_name", "candidate_first_name",
+                )
+            }
+            # The resume's own name beats the one typed at registration.
+            if result.get("candidate_name"):
+                record["candidate_name"] = result["candidate_name"]
+            print(f"✅ Pre-registered resume ready: {record['candidate_name'] or token[:8]}")
+
+        record["completed_at"] = datetime.now().isoformat(timespec="seconds")
+        await asyncio.to_thread(self._write, record)
+        if record["status"] == READY:
+            self._input_path(token).unlink(missing_ok=True)
+
+    # ---- storage --------------------------------------------------------
+
+    def _path(self, token: str) -> Path:
+        return self.directory / f"{token}.json"
+
+    def _input_path(self, token: str) -> Path:
+        return self.directory / "inputs" / f"{token}.json"
+
+    def _read(self, token: str) -> Optional[Dict[str, Any]]:
+        if not token or not _TOKEN_RE.match(token):
+            return None
+        try:
+            with open(self._path(token), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._write_json(self._path(record["token"]), record)
+
+    @staticmethod
+    def _read_json(path: Path) -> Dict[str, Any]:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path: Path, data: Dict[str, Any]) -> None:
+        # Write-then-rename, so a crash mid-write leaves the previous record
+        # rather than a truncated one that reads as an unknown token.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        tmp.replace(path)
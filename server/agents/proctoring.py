@@ -19,14 +19,21 @@ report:
 This module is the one place all of it lands, per session, so the report can
 see it. It records facts and counts; it deliberately does not decide whether
 anyone cheated.
+
+Every event is also appended, as it is recorded, to logs/<session_id>/
+proctoring.jsonl through a buffered background writer. proctoring.json is
+still written at the end of the interview for a human to read, but the
+journal is what survives a crash, and what the summary is rebuilt from.
 """
 
 import json
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from config.settings import config
+from tracking.log_writer import BufferedJsonlWriter
 
 
 # What the UI is allowed to report. An unknown type is kept rather than
@@ -34,7 +41,39 @@ from config.settings import config
 # vanishing - but only these are summarised and scored.
 FOCUS_EVENTS = {"tab_switch", "fullscreen_exit", "window_blur"}
 CLIPBOARD_EVENTS = {"paste", "copy"}
-FACE_EVENTS = {"face_out_of_view"}
+FACE_EVENTS = {"face_out_of_view", "looking_away", "multiple_faces"}
+KNOWN_EVENTS = FOCUS_EVENTS | CLIPBOARD_EVENTS | FACE_EVENTS
+
+# Distinct unknown types kept under their own name; past this they are
+# counted as "other", so a client inventing type names cannot grow the
+# per-type tables without limit.
+MAX_UNKNOWN_TYPES = 16
+
+# Sequence numbers remembered per client, and clients per session, for
+# dropping resent browser events.
+SEEN_PER_CLIENT = 1024
+MAX_CLIENTS = 16
+
+JOURNAL_NAME = "proctoring.jsonl"
+
+# Rate-limited drops reach the journal as one running count at most this
+# often (and on save()), not a line per rejected batch: otherwise a flooding
+# client would grow the journal it is being limited to protect.
+RATE_LIMITED_JOURNAL_SECONDS = 5.0
+
+# One writer for every session's journal. Never rotated: a journal is one
+# interview long, and a rotated-away half would be a half-empty summary.
+# Started and stopped with the server.
+journal = BufferedJsonlWriter(rotate_bytes=0, name="proctoring-journal")
+
+
+def _entry(at: float, event_type: str, detail: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """One stored event as the dict the JSON file and the API have always used."""
+    return {
+        "timestamp": datetime.fromtimestamp(at).isoformat(timespec="seconds"),
+        "type": event_type,
+        **(detail or {}),
+    }
 
 
 def summary_to_report_section(summary: Optional[Dict[str, Any]]) -> str:
@@ -61,7 +100,7 @@ def summary_to_report_section(summary: Optional[Dict[str, Any]]) -> str:
         return (
             "Integrity monitoring was active and recorded no events: no tab "
             "switches, no fullscreen exits, no time with the face out of "
-            "frame, and no clipboard use in the code editor."
+            "frame or looking away, and no clipboard use in the code editor."
         )
 
     longest = s.get("face_out_of_view_longest_seconds", 0)
@@ -71,6 +110,10 @@ def summary_to_report_section(summary: Optional[Dict[str, Any]]) -> str:
         f"- Face not visible in camera: {s.get('face_out_of_view_count', 0)} "
         f"time(s), {s.get('face_out_of_view_seconds', 0)}s total"
         + (f" (longest {longest}s)" if longest else ""),
+        f"- Looking away from the screen (head turned or eyes off to the side, "
+        f"face still in view): {s.get('looking_away_count', 0)} time(s), "
+        f"{s.get('looking_away_seconds', 0)}s total",
+        f"- More than one face in camera: {s.get('multiple_faces', 0)} time(s)",
         f"- Pasted into the code editor: {s.get('pastes', 0)} time(s), "
         f"{s.get('pasted_chars', 0)} characters total",
         f"- Copied from the code editor: {s.get('copies', 0)} time(s)",
@@ -88,74 +131,247 @@ def summary_to_report_section(summary: Optional[Dict[str, Any]]) -> str:
             f"({pasted} characters pasted vs {typed} typed)."
         )
 
+    if s.get("rate_limited_events"):
+        lines.append(
+            f"- NOTE: the browser sent events faster than they are accepted; "
+            f"{s['rate_limited_events']} were dropped, so the counts above are "
+            f"lower bounds. A flood of events is itself unusual."
+        )
+
+    if s.get("evidence_frames"):
+        lines.append(
+            f"- {s['evidence_frames']} camera keyframe(s) from around these "
+            f"events are saved with the session for a reviewer to check."
+        )
+
     return "\n".join(lines)
 
 
 class ProctoringLog:
-    """Accumulates integrity events for a single interview session."""
+    """
+    Accumulates integrity events for a single interview session.
+
+    The summary used to be rebuilt from the event list on every call - one
+    pass per event type, another for durations - and it is asked for on every
+    save and every report. A session with noisy telemetry (a flapping camera,
+    a candidate who alt-tabs constantly) made that linear in its own noise.
+    Now record() keeps the aggregates up to date as events arrive, summary()
+    is cached until the next write, and events are stored as compact tuples
+    that are only expanded into dicts when someone reads them.
+
+    Memory per session is bounded whatever the browser sends. Browser events
+    pass a token bucket (admit()) first; the excess is dropped and counted.
+    An event identical to the one before it, within a short window, is
+    folded into it as a count. Past a hard cap, events still update the
+    aggregates but are no longer stored one by one. The summary reports how
+    much was dropped or only counted, so a reader knows the totals are lower
+    bounds.
+    """
 
-    def __init__(self, session_id: Optional[str] = None):
+    def __init__(self, session_id: Optional[str] = None, journaled: bool = True):
         self.session_id = session_id
         self.started_at = datetime.now()
-        self.events: List[Dict[str, Any]] = []
+        # Where record() appends; None for a log with no session, or one
+        # being replayed from its own journal.
+        self._journal: Optional[Path] = (
+            config.logs_dir / session_id / JOURNAL_NAME
+            if session_id and journaled else None
+        )
+        self._journal_write({"kind": "start", "at": self.started_at.timestamp()})
+        # (epoch seconds, type, detail or None) per event; see `events`.
+        self._events: List[Tuple[float, str, Optional[Dict[str, Any]]]] = []
         # Typing is a running total rather than an event per keystroke: a
         # 45-minute interview would otherwise produce thousands of entries
         # that say nothing individually.
         self.keystrokes = 0
         self.pasted_chars = 0
 
+        # Running aggregates, kept by record().
+        self._counts: Dict[str, int] = {}
+        self._duration_total: Dict[str, float] = {}
+        self._duration_max: Dict[str, float] = {}
+        self._evidence_frames = 0
+        self._summary: Optional[Dict[str, Any]] = None
+        self._total = 0
+        # Sequence numbers already recorded, per page load of the client. A
+        # batch that is retried, or sent both by fetch and by the unload
+        # beacon, must not count twice. Every seq at or below the floor
+        # counts as seen; only the ones above it are kept.
+        self._seen: Dict[str, Tuple[int, set]] = {}
+
+        limits = config.proctoring
+        self._rate = limits.event_rate
+        self._burst = limits.event_burst
+        self._coalesce_seconds = limits.coalesce_seconds
+        self._max_events = limits.max_events
+        self._tokens = float(self._burst)
+        self._refilled = time.monotonic()
+        # Browser events dropped by the rate limit; events counted but not
+        # stored because the cap was reached.
+        self.rate_limited = 0
+        self.overflow = 0
+        # Drops not yet in the journal, and when they were last written.
+        self._rate_limited_pending = 0
+        self._rate_limited_written_at = time.monotonic()
+
     # ---- recording ------------------------------------------------------
 
-    def record(self, event_type: str, **detail: Any) -> Dict[str, Any]:
+    def record(self, event_type: str, at: Optional[float] = None, **detail: Any) -> Dict[str, Any]:
         """
         Record one event. Returns the stored entry.
 
         Args:
             event_type: e.g. "tab_switch", "paste", "face_out_of_view"
+            at: when it happened, epoch seconds (default: now) - batched
+                browser events arrive a few seconds after the fact
             detail: event-specific fields (duration, chars, source…)
         """
-        entry = {
-            "timestamp": datetime.now().isoformat(timespec="seconds"),
-            "type": event_type,
-            **{k: v for k, v in detail.items() if v is not None},
-        }
-        self.events.append(entry)
-
+        at = time.time() if at is None else at
+        detail = {k: v for k, v in detail.items() if v is not None}
+        if (
+            event_type not in self._counts
+            and event_type not in KNOWN_EVENTS
+            and len(self._counts.keys() - KNOWN_EVENTS) >= MAX_UNKNOWN_TYPES
+        ):
+            event_type = "other"
+        self._journal_write({"kind": "event", "at": at, "type": event_type, **detail})
+        self._store(at, event_type, detail)
+
+        self._total += 1
+        self._counts[event_type] = self._counts.get(event_type, 0) + 1
+        if "duration" in detail:
+            duration = float(detail["duration"] or 0)
+            self._duration_total[event_type] = self._duration_total.get(event_type, 0.0) + duration
+            self._duration_max[event_type] = max(self._duration_max.get(event_type, 0.0), duration)
+        if detail.get("evidence"):
+            self._evidence_frames += len(detail["evidence"])
         if event_type == "paste":
             self.pasted_chars += int(detail.get("chars") or 0)
-
-        return entry
+        self._summary = None
+
+        return _entry(at, event_type, detail)
+
+    def _store(self, at: float, event_type: str, detail: Dict[str, Any]) -> None:
+        """Keep one event: folded into the last if identical, dropped past the cap."""
+        if self._events:
+            last_at, last_type, last_detail = self._events[-1]
+            last_detail = last_detail or {}
+            if (
+                last_type == event_type
+                and abs(at - last_at) <= self._coalesce_seconds
+                and {k: v for k, v in last_detail.items() if k != "count"} == detail
+            ):
+                self._events[-1] = (
+                    last_at, last_type, {**last_detail, "count": last_detail.get("count", 1) + 1}
+                )
+                return
+        if len(self._events) >= self._max_events:
+            self.overflow += 1
+            return
+        self._events.append((at, event_type, detail or None))
+
+    def admit(self, count: int = 1) -> int:
+        """
+        How many of `count` browser events may be recorded now, from the
+        session's token bucket. The rest are counted as rate-limited.
+        """
+        now = time.monotonic()
+        self._tokens = min(float(self._burst), self._tokens + (now - self._refilled) * self._rate)
+        self._refilled = now
+        allowed = min(count, int(self._tokens))
+        self._tokens -= allowed
+        dropped = count - allowed
+        if dropped:
+            self.note_rate_limited(dropped)
+        return allowed
+
+    def note_rate_limited(self, count: int) -> None:
+        self.rate_limited += count
+        self._summary = None
+        self._rate_limited_pending += count
+        if time.monotonic() - self._rate_limited_written_at >= RATE_LIMITED_JOURNAL_SECONDS:
+            self._journal_rate_limited()
+
+    def _journal_rate_limited(self) -> None:
+        self._rate_limited_written_at = time.monotonic()
+        if self._rate_limited_pending:
+            self._journal_write({"kind": "rate_limited", "count": self._rate_limited_pending})
+            self._rate_limited_pending = 0
+
+    def delivered(self, client: str, seq: int) -> bool:
+        """Whether this client's event `seq` has already been recorded."""
+        floor, above = self._seen.get(client, (0, set()))
+        return seq <= floor or seq in above
+
+    def mark_delivered(self, client: str, seq: int) -> None:
+        """
+        Note that this client's event `seq` was recorded, so a resend of it
+        is ignored. Only once recorded: an event turned away by admit() has
+        not been, and may yet be sent again.
+        """
+        if client not in self._seen and len(self._seen) >= MAX_CLIENTS:
+            # Oldest page load first; it is long gone.
+            self._seen.pop(next(iter(self._seen)))
+        floor, above = self._seen.setdefault(client, (0, set()))
+        if seq <= floor:
+            return
+        above.add(seq)
+        if len(above) > SEEN_PER_CLIENT:
+            # Forget the older half: a resend that old is not coming.
+            keep = sorted(above)[SEEN_PER_CLIENT // 2:]
+            self._seen[client] = (keep[0] - 1, set(keep))
 
     def record_keystrokes(self, count: int) -> None:
         """Add to the running keystroke total (the UI batches these)."""
         if count > 0:
             self.keystrokes += int(count)
+            self._summary = None
+            self._journal_write({"kind": "keystrokes", "count": int(count)})
+
+    def _journal_write(self, line: Dict[str, Any]) -> None:
+        if self._journal is not None:
+            journal.write(self._journal, line)
 
     # ---- reading --------------------------------------------------------
 
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        """Every event, oldest first, as the dicts proctoring.json holds."""
+        return [_entry(at, event_type, detail) for at, event_type, detail in self._events]
+
+    def timed_events(self) -> List[Tuple[float, str, Optional[Dict[str, Any]]]]:
+        """Every event as (epoch seconds, type, detail), for the timeline."""
+        return list(self._events)
+
     def _count(self, event_type: str) -> int:
-        return sum(1 for e in self.events if e["type"] == event_type)
+        return self._counts.get(event_type, 0)
 
     def summary(self) -> Dict[str, Any]:
         """Counts and totals, for the report and the JSON file."""
-        out_of_view = [e for e in self.events if e["type"] == "face_out_of_view"]
-        durations = [float(e.get("duration") or 0) for e in out_of_view]
-
-        return {
-            "session_id": self.session_id,
-            "started_at": self.started_at.isoformat(timespec="seconds"),
-            "tab_switches": self._count("tab_switch"),
-            "fullscreen_exits": self._count("fullscreen_exit"),
-            "window_blurs": self._count("window_blur"),
-            "face_out_of_view_count": len(out_of_view),
-            "face_out_of_view_seconds": round(sum(durations), 1),
-            "face_out_of_view_longest_seconds": round(max(durations), 1) if durations else 0.0,
-            "pastes": self._count("paste"),
-            "pasted_chars": self.pasted_chars,
-            "copies": self._count("copy"),
-            "keystrokes": self.keystrokes,
-            "total_events": len(self.events),
-        }
+        if self._summary is None:
+            self._summary = {
+                "session_id": self.session_id,
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "tab_switches": self._count("tab_switch"),
+                "fullscreen_exits": self._count("fullscreen_exit"),
+                "window_blurs": self._count("window_blur"),
+                "face_out_of_view_count": self._count("face_out_of_view"),
+                "face_out_of_view_seconds": round(self._duration_total.get("face_out_of_view", 0.0), 1),
+                "face_out_of_view_longest_seconds": round(self._duration_max.get("face_out_of_view", 0.0), 1),
+                "looking_away_count": self._count("looking_away"),
+                "looking_away_seconds": round(self._duration_total.get("looking_away", 0.0), 1),
+                "multiple_faces": self._count("multiple_faces"),
+                "evidence_frames": self._evidence_frames,
+                "pastes": self._count("paste"),
+                "pasted_chars": self.pasted_chars,
+                "copies": self._count("copy"),
+                "keystrokes": self.keystrokes,
+                "total_events": self._total,
+                "rate_limited_events": self.rate_limited,
+                "unstored_events": self.overflow,
+            }
+        # A copy, so a caller that decorates it cannot change the cache.
+        return dict(self._summary)
 
     def report_section(self) -> str:
         """A plain-text block for the report prompt."""
@@ -164,11 +380,18 @@ class ProctoringLog:
     # ---- persistence ----------------------------------------------------
 
     def save(self, session_id: Optional[str] = None) -> Optional[Path]:
-        """Write to logs/<session_id>/proctoring.json alongside the transcript."""
+        """
+        Write logs/<session_id>/proctoring.json alongside the transcript, and
+        make sure the journal is on disk. Blocking.
+        """
         session_id = session_id or self.session_id
         if not session_id:
             return None
 
+        # The report generator reads this session back moments from now.
+        self._journal_rate_limited()
+        journal.flush()
+
         session_dir = config.logs_dir / session_id
         session_dir.mkdir(parents=True, exist_ok=True)
         path = session_dir / "proctoring.json"
@@ -181,9 +404,66 @@ class ProctoringLog:
             )
         return path
 
+    @classmethod
+    def replay(cls, session_id: str) -> Optional["ProctoringLog"]:
+        """
+        Rebuild a session's log from its journal, or None if it has none.
+
+        A line cut short by a crash mid-write is skipped; everything before
+        it still counts.
+        """
+        path = config.logs_dir / session_id / JOURNAL_NAME
+        if not path.exists():
+            return None
+
+        # Not journaled: replaying must not append to what it reads.
+        log = cls(session_id, journaled=False)
+        with open(path, "r", encoding="utf-8") as f:
+            for raw in f:
+                try:
+                    line = json.loads(raw)
+                except ValueError:
+                    continue
+                kind = line.pop("kind", None)
+                if kind == "start":
+                    log.started_at = datetime.fromtimestamp(line["at"])
+                elif kind == "event":
+                    log.record(line.pop("type"), at=line.pop("at"), **line)
+                elif kind == "keystrokes":
+                    log.record_keystrokes(line.get("count", 0))
+                elif kind == "rate_limited":
+                    log.note_rate_limited(line.get("count", 0))
+        return log
+
+    @classmethod
+    def load(cls, session_id: str) -> Optional["ProctoringLog"]:
+        """
+        replay(), with whatever is still buffered written first, for readers
+        such as the report generator. None if there is no journal, or it
+        could not be read.
+        """
+        try:
+            journal.flush()
+            return cls.replay(session_id)
+        except Exception as e:
+            print(f"Could not replay proctoring journal for {session_id}: {e}")
+            return None
+
     @staticmethod
-    def load_summary(session_id: str) -> Optional[Dict[str, Any]]:
-        """Read back a saved summary, for the report generator."""
+    def load_summary(
+        session_id: str, log: Optional["ProctoringLog"] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read back a session's summary, for the report generator: from the
+        journal when there is one - pass `log` if it was already replayed
+        with load() - else from proctoring.json (sessions from before the
+        journal existed).
+        """
+        if log is None:
+            log = ProctoringLog.load(session_id)
+        if log is not None:
+            return log.summary()
+
         path = config.logs_dir / session_id / "proctoring.json"
         if not path.exists():
             return None
@@ -0,0 +1,131 @@
+"""
+Proctoring events placed against the interview they happened in.
+
+The report used to see integrity data only as session-wide totals: "left the
+tab 4 times" reads very differently if all four were during the coding
+round. This module cuts the interview into stages from the transcript - the
+opening, each question, the coding round, the closing - and attributes every
+proctoring event to the stage that was running when it happened.
+
+Both inputs are already time-ordered (the transcript is appended as the
+interview goes; events are sorted once), so the attribution is a single
+merge pass over the two, not a scan of one per item of the other.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+# Transcript entries that start a new stage. Follow-ups inside a stage
+# (coding prompts and hints, code submissions, the intro request) do not.
+STAGE_STARTS = {"opening", "question", "coding_question", "closing"}
+
+# Reported per stage, in this order, with these words.
+STAGE_COLUMNS = (
+    ("tab_switch", "tab switch(es)"),
+    ("fullscreen_exit", "fullscreen exit(s)"),
+    ("face_out_of_view", "time(s) face out of view"),
+    ("looking_away", "time(s) looking away"),
+    ("multiple_faces", "time(s) more than one face"),
+    ("paste", "paste(s)"),
+    ("copy", "copy(ies)"),
+)
+
+
+class Stage(NamedTuple):
+    start: float
+    end: float
+    kind: str
+    question_number: Optional[int]
+
+    @property
+    def label(self) -> str:
+        if self.kind == "coding_question":
+            return f"Coding round (question {self.question_number})"
+        if self.kind == "question":
+            return f"Question {self.question_number}"
+        return self.kind.capitalize()
+
+
+def build_stages(transcript: List[Dict[str, Any]], ended_at: Optional[float] = None) -> List[Stage]:
+    """
+    The interview's stages, in order, from its transcript entries.
+
+    Each stage runs from the entry that opened it to the next one; the last
+    runs to `ended_at` (default: open-ended).
+    """
+    starts: List[Tuple[float, str, Optional[int]]] = []
+    for entry in transcript:
+        kind = entry.get("type")
+        if kind not in STAGE_STARTS or not entry.get("timestamp"):
+            continue
+        try:
+            at = datetime.fromisoformat(entry["timestamp"]).timestamp()
+        except ValueError:
+            continue
+        starts.append((at, kind, entry.get("question_number")))
+
+    stages = []
+    for i, (at, kind, number) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else (ended_at or float("inf"))
+        stages.append(Stage(at, end, kind, number))
+    return stages
+
+
+def correlate(
+    stages: List[Stage],
+    events: Iterable[Tuple[float, str, Optional[Dict[str, Any]]]],
+) -> List[Dict[str, Any]]:
+    """
+    Per-stage aggregates: one row per stage that saw any events.
+
+    Args:
+        stages: from build_stages, in order
+        events: (epoch seconds, type, detail) - ProctoringLog.timed_events()
+
+    Events before the first stage (the device check, the wait for the
+    avatar) are not attributed to any question and are left out.
+    """
+    rows = [
+        {"stage": s.label, "question_number": s.question_number,
+         "coding": s.kind == "coding_question", "counts": {}, "seconds": {}}
+        for s in stages
+    ]
+    i = 0
+    for at, event_type, detail in sorted(events, key=lambda e: e[0]):
+        while i < len(stages) and at >= stages[i].end:
+            i += 1
+        if i == len(stages):
+            break
+        if at < stages[i].start:
+            continue
+        row = rows[i]
+        # Repeats folded into one stored event carry their count.
+        row["counts"][event_type] = row["counts"].get(event_type, 0) + (detail or {}).get("count", 1)
+        duration = (detail or {}).get("duration")
+        if duration:
+            row["seconds"][event_type] = round(
+                row["seconds"].get(event_type, 0.0) + float(duration), 1
+            )
+    return [row for row in rows if row["counts"]]
+
+
+def stages_to_report_section(rows: List[Dict[str, Any]]) -> str:
+    """
+    Render per-stage aggregates for the report prompt, or "" if there are
+    none. Like the session totals, observations rather than conclusions.
+    """
+    lines = []
+    for row in rows:
+        parts = []
+        for event_type, words in STAGE_COLUMNS:
+            count = row["counts"].get(event_type)
+            if not count:
+                continue
+            seconds = row["seconds"].get(event_type)
+            parts.append(f"{count} {words}" + (f" ({seconds}s)" if seconds else ""))
+        if parts:
+            lines.append(f"- {row['stage']}: " + ", ".join(parts))
+    if not lines:
+        return ""
+    return "When these happened, by stage of the interview:\n" + "\n".join(lines)
@@ -4,7 +4,7 @@ Generates comprehensive interview reports and sends via email
 """
 
 import anthropic
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
 from datetime import datetime
 from pathlib import Path
@@ -22,6 +22,8 @@ from prompts.agent_prompts import get_report_generator_prompt
 from agents.response_utils import first_text
 from agents.report_pdf import render_report_pdf
 from agents.proctoring import ProctoringLog, summary_to_report_section
+from agents.proctoring_timeline import build_stages, correlate, stages_to_report_section
+from agents.code_revisions import CodeRevisionLog, revisions_to_report_section
 
 
 class ReportGeneratorAgent:
@@ -287,6 +289,26 @@ AI Interview System
             print(f"   The report is still saved: {report_file}")
             return False
     
+    @staticmethod
+    def proctoring_by_stage(
+        session_id: str, log: Optional[ProctoringLog], transcript_json_file: Path
+    ) -> str:
+        """
+        The session's proctoring events broken down by interview stage, as
+        report text, or "" when there is no journal or no transcript to
+        line them up against.
+        """
+        if log is None or not transcript_json_file.exists():
+            return ""
+        try:
+            with open(transcript_json_file, 'r', encoding='utf-8') as f:
+                transcript = json.load(f).get('transcript') or []
+        except Exception as e:
+            print(f"Could not read transcript for {session_id}: {e}")
+            return ""
+        stages = build_stages(transcript)
+        return stages_to_report_section(correlate(stages, log.timed_events()))
+
     def generate_and_send_report(
         self,
         session_id: str,
@@ -341,11 +363,20 @@ AI Interview System
         
         # Integrity observations, if the session recorded any. Read off disk
         # rather than passed in: the report runs in a background task after
-        # the response has gone out, and /api/interview/end saves this file
-        # immediately before queueing it.
+        # the response has gone out, and /api/interview/end flushes the
+        # session's journal immediately before queueing it. Replayed once:
+        # the totals and the per-stage breakdown both come from it.
+        proctoring_log = ProctoringLog.load(session_id)
         proctoring_summary = summary_to_report_section(
-            ProctoringLog.load_summary(session_id)
+            ProctoringLog.load_summary(session_id, proctoring_log)
         )
+        by_stage = self.proctoring_by_stage(session_id, proctoring_log, transcript_json_file)
+        if by_stage:
+            proctoring_summary = f"{proctoring_summary}\n\n{by_stage}"
+        code_log, _ = CodeRevisionLog.replay(session_id)
+        code_history = revisions_to_report_section(code_log.summary() if code_log else None)
+        if code_history:
+            proctoring_summary = f"{proctoring_summary}\n\n{code_history}"
 
         # Generate report
         report_data = self.generate_report(
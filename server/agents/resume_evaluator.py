@@ -4,7 +4,8 @@ Analyzes candidate resume against job description
 """
 
 import anthropic
-from typing import Dict, Any
+import asyncio
+from typing import Any, Callable, Dict, Optional
 import json
 from pathlib import Path
 import sys
@@ -13,7 +14,10 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from config.settings import config
-from prompts.agent_prompts import get_resume_evaluator_prompt
+from prompts.agent_prompts import (
+    get_resume_evaluator_prompt,
+    get_resume_screening_prompt,
+)
 from agents.response_utils import first_text
 
 
@@ -168,6 +172,71 @@ class ResumeEvaluatorAgent:
             "model_used": self.model
         }
     
+    def score_fit(self, analysis_text: str, job_description: str) -> Dict[str, Any]:
+        """
+        Turn a resume analysis into a rankable fit score.
+
+        Used by bulk screening, where hundreds of analyses have to be put in
+        order; a live interview never needs one.
+
+        Returns:
+            {"fit_score": 0-100, "recommendation": ..., "strengths": [...],
+            "gaps": [...]}. A score of -1 means the rating could not be read.
+        """
+        # Structured output so the score is parsed, not scraped out of prose.
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=1024,
+            output_config={
+                "format": {
+                    "type": "json_schema",
+                    "schema": {
+                        "type": "object",
+                        "properties": {
+                            "fit_score": {
+                                "type": "integer",
+                                "description": "Fit for the role, 0-100."
+                            },
+                            "recommendation": {
+                                "type": "string",
+                                "enum": ["interview", "maybe", "reject"],
+                            },
+                            "strengths": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Up to three short phrases."
+                            },
+                            "gaps": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "Up to three short phrases."
+                            },
+                        },
+                        "required": ["fit_score", "recommendation", "strengths", "gaps"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            messages=[{
+                "role": "user",
+                "content": get_resume_screening_prompt(analysis_text, job_description)
+            }]
+        )
+
+        try:
+            rating = json.loads(first_text(response))
+            score = max(0, min(100, int(rating.get("fit_score"))))
+        except (json.JSONDecodeError, ValueError, TypeError) as e:
+            print(f"⚠️  Could not read fit score: {e}")
+            return {"fit_score": -1, "recommendation": "maybe", "strengths": [], "gaps": []}
+
+        return {
+            "fit_score": score,
+            "recommendation": rating.get("recommendation", "maybe"),
+            "strengths": list(rating.get("strengths") or [])[:3],
+            "gaps": list(rating.get("gaps") or [])[:3],
+        }
+
     def save_analysis(self, analysis: Dict[str, Any], session_id: str) -> Path:
         """
         Save analysis to file
@@ -208,47 +277,107 @@ class ResumeEvaluatorAgent:
         
         return analysis_file
     
-    async def process_resume(
+    async def evaluate(
         self,
         resume_pdf_base64: str,
         job_description: str,
-        session_id: str
+        progress: Optional[Callable[..., None]] = None
     ) -> Dict[str, Any]:
         """
-        Complete resume processing pipeline
-        
+        Read, identify and analyse a resume without filing it anywhere.
+
+        The three Claude calls are blocking HTTP, so each runs on a worker
+        thread - this used to run them inline in an async method, which held
+        the event loop (and every other interview on the node) for the whole
+        of a candidate's resume analysis. Name extraction and the analysis
+        both need only the extracted text, so they run side by side rather
+        than one after the other.
+
         Args:
             resume_pdf_base64: Base64 encoded PDF
             job_description: Job description text
-            session_id: Session identifier
-            
+            progress: Optional callback, called as progress(stage, **detail)
+                as each step lands
+
         Returns:
-            Analysis results with file path
+            Analysis results plus the candidate's name
         """
         import base64
-        
+
+        def report(stage: str, **detail: Any) -> None:
+            if progress:
+                progress(stage, **detail)
+
         # Decode PDF
         pdf_bytes = base64.b64decode(resume_pdf_base64)
-        
+
         # Extract text
         print("📄 Extracting text from resume PDF...")
-        resume_text = self.extract_text_from_pdf(pdf_bytes)
+        report("reading_resume")
+        resume_text = await asyncio.to_thread(self.extract_text_from_pdf, pdf_bytes)
+        report("resume_read")
 
-        # Read the candidate's name off the resume
-        name = self.extract_candidate_name(resume_text)
+        name_task = asyncio.create_task(
+            asyncio.to_thread(self.extract_candidate_name, resume_text)
+        )
+        analysis_task = asyncio.create_task(
+            asyncio.to_thread(self.analyze_resume, resume_text, job_description)
+        )
 
-        # Analyze
-        analysis = self.analyze_resume(resume_text, job_description)
+        try:
+            # The name is the quicker of the two; surface it as soon as it is
+            # known so the client can greet the real candidate while the
+            # analysis is still running.
+            name = await name_task
+            report(
+                "candidate_identified",
+                candidate_name=name["full_name"],
+                candidate_first_name=name["first_name"],
+            )
+            analysis = await analysis_task
+        except BaseException:
+            analysis_task.cancel()
+            raise
+        report("analysis_ready")
+
+        return {
+            **analysis,
+            "candidate_name": name["full_name"],
+            "candidate_first_name": name["first_name"],
+        }
+
+    async def process_resume(
+        self,
+        resume_pdf_base64: str,
+        job_description: str,
+        session_id: str,
+        progress: Optional[Callable[..., None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Complete resume processing pipeline
+        
+        Args:
+            resume_pdf_base64: Base64 encoded PDF
+            job_description: Job description text
+            session_id: Session identifier
+            progress: Optional stage callback, see evaluate()
+            
+        Returns:
+            Analysis results with file path
+        """
+        result = await self.evaluate(resume_pdf_base64, job_description, progress)
 
         # Save
+        analysis = {
+            key: result[key]
+            for key in ("analysis", "resume_text", "job_description", "model_used")
+        }
         analysis_file = self.save_analysis(analysis, session_id)
 
         return {
-            **analysis,
+            **result,
             "analysis_file": str(analysis_file),
             "session_id": session_id,
-            "candidate_name": name["full_name"],
-            "candidate_first_name": name["first_name"],
         }
 
 
@@ -0,0 +1,287 @@
+"""
+Bulk resume screening
+
+Pre-screens a pool of resumes against one job description and writes a
+ranked shortlist, without creating any interview sessions. The only other way
+to reach ResumeEvaluatorAgent is a live session init, one candidate at a
+time, which turns a 500-resume requisition into an afternoon of uploads.
+
+Run from server/:
+
+    python -m agents.resume_screening --jd jd.txt --input resumes/ --out screening/
+    python -m agents.resume_screening --jd jd.txt --input resumes.zip --out screening/
+
+Each resume costs three Claude calls (read, analyse, score), and those are
+fanned out with bounded concurrency so a large pool finishes in minutes
+without tripping the API's rate limits. Every finished resume is written to
+<out>/results/ under a key derived from the PDF's bytes and the job
+description, so an interrupted run picks up where it stopped, and re-running
+with a few new resumes only pays for the new ones. A PDF that appears twice
+in the pool is screened once.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config.settings import config
+from agents.resume_evaluator import ResumeEvaluatorAgent
+
+
+def _resume_entries(source: Path) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+    """
+    Yield (name, read) for each PDF in a directory tree or a .zip archive,
+    where read() returns its bytes - valid until the next entry is taken.
+    """
+    if source.is_dir():
+        for path in sorted(source.rglob("*")):
+            if path.is_file() and path.suffix.lower() == ".pdf":
+                yield str(path.relative_to(source)), path.read_bytes
+        return
+
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                # Skip directories and the macOS resource-fork shadows that
+                # zip tools add next to every real file.
+                if info.is_dir() or "__MACOSX/" in info.filename:
+                    continue
+                if info.filename.lower().endswith(".pdf"):
+                    yield info.filename, lambda info=info: archive.read(info)
+        return
+
+    raise ValueError(f"{source} is neither a directory nor a .zip archive")
+
+
+def iter_resume_pdfs(source: Path) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, pdf bytes) from a directory tree or a .zip archive."""
+    for name, read in _resume_entries(source):
+        yield name, read()
+
+
+def count_resume_pdfs(source: Path) -> int:
+    """How many PDFs iter_resume_pdfs will yield, without reading any."""
+    return sum(1 for _ in _resume_entries(source))
+
+
+def _result_key(pdf_bytes: bytes, jd_hash: str) -> str:
+    pdf_hash = hashlib.sha256(pdf_bytes).hexdigest()
+    return hashlib.sha256(f"{pdf_hash}:{jd_hash}".encode()).hexdigest()[:32]
+
+
+class ResumeScreening:
+    """One screening run: a pool of resumes against one job description."""
+
+    def __init__(
+        self,
+        job_description: str,
+        out_dir: Path,
+        concurrency: Optional[int] = None,
+    ):
+        self.job_description = job_description
+        self.jd_hash = hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+        self.out_dir = Path(out_dir)
+        self.results_dir = self.out_dir / "results"
+        self.concurrency = max(1, concurrency or config.interview.screening_concurrency)
+        # One agent for the whole run. Its Anthropic client is thread-safe and
+        # pools connections, so every worker reuses the same warm ones.
+        self.agent = ResumeEvaluatorAgent()
+
+        self.total = 0
+        self.done = 0
+        self.cached = 0
+        self.failed = 0
+        self._started = 0.0
+
+    # ---- per resume -----------------------------------------------------
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.results_dir / f"{key}.json", "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError, OSError):
+            return None
+        # A failure is not a result: retry it on the next run.
+        return result if result.get("status") == "ok" else None
+
+    def _screen_one(self, name: str, pdf_bytes: bytes) -> Dict[str, Any]:
+        """Read, analyse and score one resume. Blocking; runs on a worker thread."""
+        agent = self.agent
+        resume_text = agent.extract_text_from_pdf(pdf_bytes)
+        analysis = agent.analyze_resume(resume_text, self.job_description)
+        rating = agent.score_fit(analysis["analysis"], self.job_description)
+        return {
+            "status": "ok",
+            "file": name,
+            **rating,
+            "analysis": analysis["analysis"],
+            "screened_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    async def _screen(
+        self,
+        name: str,
+        pdf_bytes: bytes,
+        key: str,
+    ) -> Dict[str, Any]:
+        try:
+            result = await asyncio.to_thread(self._screen_one, name, pdf_bytes)
+        except Exception as e:
+            self.failed += 1
+            result = {"status": "failed", "file": name, "error": str(e)}
+
+        with open(self.results_dir / f"{key}.json", "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        self._progress(result)
+        return result
+
+    def _progress(self, result: Dict[str, Any]) -> None:
+        self.done += 1
+        elapsed = time.monotonic() - self._started
+        fresh = self.done - self.cached
+        remaining = self.total - self.done
+        eta = (elapsed / fresh * remaining) if fresh else 0
+        outcome = (
+            f"{result['fit_score']:>3}/100"
+            if result.get("status") == "ok"
+            else f"FAILED: {result.get('error')}"
+        )
+        print(
+            f"[{self.done}/{self.total}] {result['file']}: {outcome} "
+            f"({elapsed:.0f}s elapsed, ~{eta:.0f}s left)"
+        )
+
+    # ---- the run --------------------------------------------------------
+
+    async def run(self, source: Path) -> List[Dict[str, Any]]:
+        """
+        Screen every PDF under source and write the ranked summary.
+
+        A PDF is read only once a screening slot is free for it, and the slot
+        is held until its screening finishes - so at most `concurrency`
+        resumes are in memory, however large the pool.
+        """
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self._started = time.monotonic()
+        self.total = await asyncio.to_thread(count_resume_pdfs, source)
+        slots = asyncio.Semaphore(self.concurrency)
+
+        results: List[Dict[str, Any]] = []
+        tasks = []
+        scheduled = set()
+        pdfs = iter_resume_pdfs(source)
+        while True:
+            await slots.acquire()
+            # Reading and unzipping block; off the loop, running screenings
+            # keep reporting meanwhile.
+            item = await asyncio.to_thread(next, pdfs, None)
+            if item is None:
+                slots.release()
+                break
+            name, pdf_bytes = item
+            key = _result_key(pdf_bytes, self.jd_hash)
+            cached = self._cached(key)
+            if cached or key in scheduled:
+                slots.release()
+                if cached:
+                    self.cached += 1
+                    self.done += 1
+                    results.append({**cached, "file": name})
+                else:
+                    # The same PDF twice in one pool: screen it once.
+                    self.total -= 1
+                    print(f"⏭️  {name} is a duplicate of an earlier file - skipping")
+                continue
+            task = asyncio.create_task(self._screen(name, pdf_bytes, key))
+            task.add_done_callback(lambda _: slots.release())
+            scheduled.add(key)
+            tasks.append(task)
+
+        results.extend(await asyncio.gather(*tasks))
+        if self.cached:
+            print(f"♻️  {self.cached} of {self.total} resume(s) were already screened - reused")
+        self.write_summary(results)
+        return results
+
+    def write_summary(self, results: List[Dict[str, Any]]) -> Path:
+        """Write ranking.json and a readable ranking.txt, best fit first."""
+        ranked = sorted(
+            (r for r in results if r.get("status") == "ok"),
+            key=lambda r: r.get("fit_score", -1),
+            reverse=True,
+        )
+        failures = [r for r in results if r.get("status") != "ok"]
+
+        with open(self.out_dir / "ranking.json", "w", encoding="utf-8") as f:
+            json.dump({
+                "generated_at": datetime.now().isoformat(timespec="seconds"),
+                "job_description": self.job_description,
+                "screened": len(ranked),
+                "failed": [{"file": r["file"], "error": r.get("error")} for r in failures],
+                "ranking": [
+                    {k: v for k, v in r.items() if k != "analysis"} for r in ranked
+                ],
+            }, f, indent=2)
+
+        summary_file = self.out_dir / "ranking.txt"
+        with open(summary_file, "w", encoding="utf-8") as f:
+            f.write("=" * 80 + "\n")
+            f.write("RESUME SCREENING - RANKED\n")
+            f.write("=" * 80 + "\n")
+            f.write(f"Screened: {len(ranked)}   Failed: {len(failures)}\n")
+            f.write("=" * 80 + "\n")
+            for rank, r in enumerate(ranked, start=1):
+                f.write(
+                    f"\n{rank:>3}. {r['file']}  -  {r['fit_score']}/100 "
+                    f"({r.get('recommendation', 'maybe')})\n"
+                )
+                if r.get("strengths"):
+                    f.write(f"     + {'; '.join(r['strengths'])}\n")
+                if r.get("gaps"):
+                    f.write(f"     - {'; '.join(r['gaps'])}\n")
+            if failures:
+                f.write("\n" + "=" * 80 + "\nFAILED (re-run to retry)\n")
+                for r in failures:
+                    f.write(f"  {r['file']}: {r.get('error')}\n")
+
+        print(f"📁 Ranking written to: {summary_file}")
+        return summary_file
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Pre-screen a pool of resumes against one job description."
+    )
+    parser.add_argument("--jd", required=True, type=Path,
+                        help="Job description as a text file")
+    parser.add_argument("--input", required=True, type=Path,
+                        help="Directory of resume PDFs, or a .zip of them")
+    parser.add_argument("--out", required=True, type=Path,
+                        help="Output directory; re-use it to resume a run")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Resumes in flight at once (default: SCREENING_CONCURRENCY)")
+    args = parser.parse_args(argv)
+
+    job_description = args.jd.read_text(encoding="utf-8").strip()
+    if not job_description:
+        parser.error(f"{args.jd} is empty")
+
+    screening = ResumeScreening(job_description, args.out, args.concurrency)
+    results = asyncio.run(screening.run(args.input))
+    if not results:
+        print(f"No PDFs found in {args.input}")
+        return 1
+    return 1 if screening.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,21 +19,19 @@ enable_unicode_output()
 
 from fastapi import (
     FastAPI, WebSocket, WebSocketDisconnect, HTTPException, UploadFile, File,
-    Form, Request, BackgroundTasks
+    Form, Request, BackgroundTasks, Header
 )
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 import json
 import uuid
+import hashlib
 import asyncio
 import aiohttp
 from datetime import datetime
 import base64
-import numpy as np 
-import cv2
-import mediapipe as mp
 import time
 
 
@@ -43,22 +41,42 @@ from agents.resume_evaluator import ResumeEvaluatorAgent
 from agents.interviewer import InterviewerAgent
 from agents.report_generator import ReportGeneratorAgent
 from agents.response_utils import first_text, sanitize_candidate_speech
-from agents.proctoring import ProctoringLog
+from agents.proctoring import ProctoringLog, journal as proctoring_journal
+from agents.code_revisions import CodeRevisionLog
+from agents.preregistration import PreRegistrationQueue, PreRegistrationError
+from prompts.agent_prompts import render_greeting
 
 # Import config
 from config.settings import config, validate_config
 
+from tracking.video_pool import TrackerLease, VideoWorkerPool
+from tracking.frame_mailbox import FrameMailbox, frame_stats
+from tracking.capture_rate import REDUCED_WIDTH, CaptureRateController
+from tracking.state_intervals import (
+    IN_VIEW, LOOKING_AWAY, ON_SCREEN, OUT_OF_VIEW, Interval, StateIntervals,
+)
+from tracking.log_writer import BufferedJsonlWriter
+from tracking.evidence import EvidenceBuffer
+from tracking.multiplex import (
+    CHANNEL_NAMES, CODE, CONTROL, EVENTS, VIDEO,
+    ChannelQueue, MuxSender, decode,
+)
+
 # Tavus integration
 import anthropic
 
 
-# Mediapipe Setup
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(
-    max_num_faces=1,
-    refine_landmarks=True,
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5
+# Face tracking runs in worker processes; see tracking/video_pool.py.
+video_pool = VideoWorkerPool()
+
+# Device checks get a pool of their own, so a waiting room full of candidates
+# adjusting their cameras cannot slow proctoring for interviews in progress:
+# few workers, the cheapest detector tier, no evidence, a low frame rate, and
+# a cap on how many may run at once.
+device_check_pool = VideoWorkerPool(
+    workers=config.video.device_check_workers,
+    name="device-check",
+    light=True,
 )
 
 
@@ -70,32 +88,61 @@ log_dir.mkdir(parents=True, exist_ok=True)
 
 log_file = log_dir / "eye_tracking.jsonl"
 
-def write_log(event_type, duration=None):
-    log_entry = {
-        "timestamp": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        "event": event_type,
-        "duration": duration
-    }
-    # Explicit encoding: Windows would otherwise write cp1252 and choke on
-    # any non-ASCII content.
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(json.dumps(log_entry) + "\n")
+# Tracking records are buffered and written by a background thread; see
+# tracking/log_writer.py.
+tracking_log = BufferedJsonlWriter()
+
+def write_log(session_id: Optional[str], interval: Interval):
+    """
+    Queue one closed tracking interval for writing.
+
+    An interview's intervals go next to its transcript, in
+    logs/<session_id>/tracking.jsonl; device-check streams have no session
+    and go to the shared eye_tracking.jsonl.
+
+    `session_id` names a directory, so it must be one session_manager knows
+    - never a raw query parameter, which could be "../../anywhere".
+    """
+    path = config.logs_dir / session_id / "tracking.jsonl" if session_id else log_file
+    tracking_log.write(path, interval.as_record())
+
 
-# Eye landmark indices
-LEFT_EYE_INDICES = [33, 133]
-RIGHT_EYE_INDICES = [362, 263]
+# With replies sent only on a change, a verdict is repeated this often anyway
+# so a client that missed one, or just connected its handler, catches up.
+VERDICT_HEARTBEAT_SECONDS = 5.0
 
+# Looking away for less than this is reading, thinking, or a glance at the
+# keyboard - not something to put in front of a hiring manager.
+LOOKING_AWAY_MIN_SECONDS = 4.0
 
+# A second face is recorded (with evidence) at most this often per stream;
+# someone standing behind the candidate is one event, not one per frame.
+MULTIPLE_FACES_COOLDOWN_SECONDS = 30.0
 
 
 # Pydantic models
 class SessionInitRequest(BaseModel):
-    resume_base64: str
-    job_description: str
-    job_role: str
+    # Required unless interview_token is given, in which case the resume was
+    # submitted (and analysed) ahead of time and these come from that record.
+    resume_base64: Optional[str] = None
+    job_description: Optional[str] = None
+    job_role: Optional[str] = None
+    # Token from POST /api/candidates/preregister.
+    interview_token: Optional[str] = None
+    # Duplicate suppression. A double-click or a browser retry must not pay
+    # for a second resume analysis and a second Tavus conversation. Send an
+    # explicit key (or the Idempotency-Key header), or a nonce the client
+    # keeps for one upload attempt - the key is then derived from it plus the
+    # resume and job description.
+    idempotency_key: Optional[str] = None
+    client_nonce: Optional[str] = None
     # Optional: the name is read off the resume. Only used as a fallback when
     # the resume has no identifiable name.
     candidate_name: Optional[str] = None
+    # Respond as soon as the session id exists, instead of after the resume
+    # analysis and avatar setup. The rest arrives as progress events on
+    # GET /api/session/{session_id}/progress.
+    background: bool = False
 
 
 class SessionInitResponse(BaseModel):
@@ -111,6 +158,13 @@ class SessionInitResponse(BaseModel):
     candidate_first_name: str
 
 
+class PreRegisterRequest(BaseModel):
+    resume_base64: str
+    job_description: str
+    job_role: str
+    candidate_name: Optional[str] = None
+
+
 class InterviewMessage(BaseModel):
     session_id: str
     message: str
@@ -194,6 +248,51 @@ def write_cached_pal(base_url: str, pal_id: str) -> None:
         print(f"Could not write PAL cache to {cache_path}: {e}")
 
 
+class InitProgress:
+    """
+    Stage events for one background session init.
+
+    Kept as a list rather than fired and forgotten: the client subscribes
+    after it has the session id, by which point the first stages may already
+    have happened, so every subscriber gets the history replayed first.
+    """
+
+    # Stages after which nothing more will be published.
+    TERMINAL = {"ready", "failed"}
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.events: List[Dict[str, Any]] = []
+        self.done = False
+        self._changed = asyncio.Event()
+
+    def publish(self, stage: str, **detail: Any) -> None:
+        """Record a stage and wake every subscriber."""
+        self.events.append({
+            "stage": stage,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            **{k: v for k, v in detail.items() if v is not None},
+        })
+        if stage in self.TERMINAL:
+            self.done = True
+        # Swap in a fresh event before setting the old one, so waiters that
+        # wake and loop round block on the next change, not this one.
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def subscribe(self):
+        """Yield every event, past and future, until a terminal stage."""
+        seen = 0
+        while True:
+            changed = self._changed
+            while seen < len(self.events):
+                yield self.events[seen]
+                seen += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
 # Global state management
 class SessionManager:
     def __init__(self):
@@ -201,6 +300,17 @@ class SessionManager:
         self.tavus_client: Optional[aiohttp.ClientSession] = None
         # Resolved once per process; see ensure_tavus_pal().
         self.tavus_pal_id: Optional[str] = None
+        # Serialises PAL provisioning. Session init now resolves the PAL
+        # concurrently with the resume analysis, so two candidates starting at
+        # once would otherwise each create a PAL.
+        self._pal_lock: Optional[asyncio.Lock] = None
+        # Progress of background session inits, by session id.
+        self.init_jobs: Dict[str, "InitProgress"] = {}
+        # Session inits by idempotency key: those still running, and finished
+        # ones with the time their cached response expires. Each carries the
+        # digest of the request it was made for; see _init_payload_digest.
+        self.init_inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self.init_results: Dict[str, tuple] = {}
     
     async def initialize_tavus(self):
         """Initialize Tavus HTTP client"""
@@ -228,6 +338,16 @@ class SessionManager:
         if not self.tavus_client:
             return None
 
+        if self._pal_lock is None:
+            self._pal_lock = asyncio.Lock()
+        async with self._pal_lock:
+            # Another init may have provisioned it while we waited.
+            if self.tavus_pal_id:
+                return self.tavus_pal_id
+            return await self._provision_tavus_pal()
+
+    async def _provision_tavus_pal(self) -> Optional[str]:
+        """Find or create the PAL. Callers hold _pal_lock."""
         # A PAL created for this exact URL in an earlier run is still valid;
         # creating another would just leave the old one on the account.
         cached = read_cached_pal(config.api.tavus_llm_base_url)
@@ -295,6 +415,28 @@ class SessionManager:
             print(f"Error creating Tavus PAL: {e}")
             return None
 
+    async def warm_tavus(self) -> None:
+        """Open a connection to Tavus ahead of creating the conversation.
+
+        The TLS handshake is otherwise paid inside create_tavus_conversation,
+        on the candidate's critical path. Run alongside the greeting, it costs
+        nothing: by the time the greeting exists the pooled connection is
+        ready. Best-effort - a failure here just means the real call opens
+        its own connection.
+        """
+        if not self.tavus_client:
+            return
+        pal_id = await self.ensure_tavus_pal()
+        if not pal_id:
+            return
+        try:
+            async with self.tavus_client.get(
+                f"https://tavusapi.com/v2/pals/{pal_id}"
+            ) as response:
+                await response.read()
+        except Exception as e:
+            print(f"Tavus warm-up failed (continuing): {e}")
+
     async def create_tavus_conversation(
         self,
         session_id: str,
@@ -411,6 +553,43 @@ class SessionManager:
 
         return session_id
     
+    def cached_init(self, key: str) -> Optional["SessionInitResponse"]:
+        """A finished init's response for this key, if it is still reusable."""
+        now = time.monotonic()
+        for stale in [k for k, (expires, _, _) in self.init_results.items() if expires <= now]:
+            del self.init_results[stale]
+
+        entry = self.init_results.get(key)
+        if not entry:
+            return None
+        response = entry[1]
+
+        # Only hand back a session the candidate can still use: not one that
+        # has since ended, and not a background init that went on to fail.
+        session = self.sessions.get(response.session_id)
+        if session and session.get("status") == "completed":
+            return None
+        job = self.init_jobs.get(response.session_id)
+        if job and job.events and job.events[-1]["stage"] == "failed":
+            return None
+        if not session and not job:
+            return None
+        return response
+
+    def remember_init(self, key: str, payload: str, response: "SessionInitResponse") -> None:
+        ttl = config.interview.init_idempotency_ttl
+        if ttl > 0:
+            self.init_results[key] = (time.monotonic() + ttl, response, payload)
+
+    def init_payload(self, key: str) -> Optional[str]:
+        """The request digest an init under this key was made for, if any."""
+        if key in self.init_inflight:
+            return self.init_inflight[key][0]
+        entry = self.init_results.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[2]
+        return None
+
     def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session data"""
         return self.sessions.get(session_id)
@@ -425,6 +604,9 @@ class SessionManager:
 # Global session manager
 session_manager = SessionManager()
 
+# Resumes analysed ahead of interview time; see agents/preregistration.py.
+preregistration = PreRegistrationQueue()
+
 
 async def notify_session(session_id: Optional[str], payload: Dict[str, Any]):
     """Push an event to the browser over the session's control WebSocket.
@@ -447,6 +629,16 @@ async def notify_session(session_id: Optional[str], payload: Dict[str, Any]):
         session["control_ws"] = None
 
 
+async def open_interview(interviewer: InterviewerAgent, job_role: str) -> str:
+    """Produce the opening line, from a template or from Claude per GREETING_MODE."""
+    if config.interview.greeting_mode == "llm":
+        # start_interview does blocking HTTP to Anthropic.
+        return await asyncio.to_thread(interviewer.start_interview)
+    return interviewer.start_interview(
+        greeting=render_greeting(interviewer.candidate_first_name, job_role)
+    )
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup"""
@@ -461,6 +653,12 @@ async def startup_event():
     
     # Initialize Tavus
     await session_manager.initialize_tavus()
+
+    await preregistration.start()
+    video_pool.start()
+    device_check_pool.start()
+    tracking_log.start()
+    proctoring_journal.start()
     
     print(f"\n✅ Server ready!")
     print(f"   Avatar: {'enabled' if config.enable_avatar else 'disabled'}")
@@ -473,6 +671,11 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    await preregistration.close()
+    video_pool.close()
+    device_check_pool.close()
+    tracking_log.close()
+    proctoring_journal.close()
     await session_manager.close_tavus()
     print("✅ Server shutdown complete")
 
@@ -500,84 +703,221 @@ async def receive_video(websocket: WebSocket, session_id: Optional[str] = None):
     are attributed to that interview's proctoring log and reach the report -
     previously every event went to one global jsonl with no session id, so the
     data existed but could never be tied to an interview.
+
+    Replies are text: "face_in_frame" / "face_out_of_frame" when the state
+    changes (and every few seconds regardless), plus a JSON
+    {"type": "capture", ...} whenever the server wants the client to
+    change its capture interval or width (see tracking/capture_rate.py).
     """
     await websocket.accept()
     proctoring = (session_manager.get_session(session_id) or {}).get("proctoring") \
         if session_id else None
+
+    # No interview to attribute events to means a device check, whatever the
+    # query string says.
+    device_check = proctoring is None
+    # Only a session the server knows may name a log directory; a device
+    # check logs to the shared file.
+    known_session = None if device_check else session_id
+    pool = device_check_pool if device_check else video_pool
+    if device_check and pool.open_streams >= config.video.device_check_max_streams:
+        # 1013 "try again later": the page tells the candidate and moves on;
+        # the camera is checked again when the interview starts anyway.
+        await websocket.close(code=1013, reason="Camera check is busy")
+        return
     print(f"WebSocket connection accepted (session {session_id or 'device-check'})")
 
-    out_of_view = False
-    out_start_time = None
+    # This stream's own face tracker, for as long as the socket is open.
+    lease = pool.lease()
+
+    # Frames are read off the socket as fast as they arrive and parked in a
+    # one-slot mailbox; the loop below analyses whichever is newest when it
+    # is free. If inference falls behind, stale frames are dropped unread
+    # rather than queueing up and making the feedback lag.
+    mailbox = FrameMailbox()
+
+    async def read_frames():
+        try:
+            while True:
+                mailbox.put(await websocket.receive_bytes())
+        except Exception as e:
+            print("Disconnected:", e)
+        finally:
+            mailbox.close()
+
+    reader = asyncio.create_task(read_frames())
+
+    async def send(message):
+        if isinstance(message, dict):
+            await websocket.send_json(message)
+        else:
+            await websocket.send_text(message)
+
     try:
-        while True:
-            frame_bytes = await websocket.receive_bytes()
-            np_frame = np.frombuffer(frame_bytes, dtype=np.uint8)
-            frame = cv2.imdecode(np_frame, cv2.IMREAD_COLOR)
+        await track_camera(known_session, proctoring, pool, lease, mailbox, send, device_check=device_check)
+    finally:
+        reader.cancel()
+        pool.release(lease)
+
+
+async def track_camera(
+    session_id: Optional[str],
+    proctoring: Optional[ProctoringLog],
+    pool: VideoWorkerPool,
+    lease: TrackerLease,
+    mailbox: FrameMailbox,
+    send,
+    device_check: bool = False,
+):
+    """
+    Analyse one camera stream until its mailbox closes.
 
-            if frame is None:
-                continue
+    `session_id` must be a session the server knows, or None: it becomes a
+    directory under logs/.
 
-            h, w, _ = frame.shape
-            margin_x = int(0.20 * w)
-            safe_zone = ((margin_x, 0), (w - margin_x, h))
-
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(rgb_frame)
-
-            eyes_detected = False
-            face_in_center = False
-
-            if results.multi_face_landmarks:
-                for face_landmarks in results.multi_face_landmarks:
-                    face_center = face_landmarks.landmark[1]
-                    cx, cy = int(face_center.x * w), int(face_center.y * h)
-
-                    if margin_x < cx < (w - margin_x) and 0 < cy < h:
-                        face_in_center = True
-
-                    left_eye_points = [(int(face_landmarks.landmark[i].x * w), int(face_landmarks.landmark[i].y * h)) for i in LEFT_EYE_INDICES]
-                    right_eye_points = [(int(face_landmarks.landmark[i].x * w), int(face_landmarks.landmark[i].y * h)) for i in RIGHT_EYE_INDICES]
-
-                    if len(left_eye_points) == 2 and len(right_eye_points) == 2:
-                        eyes_detected = True
-            
-            if not eyes_detected or not face_in_center:
-                if not out_of_view:
-                    out_of_view = True
-                    out_start_time = time.time()
-            elif eyes_detected and face_in_center and out_of_view:
-                out_of_view = False
-                out_duration = time.time() - out_start_time
-                write_log("Out of view", duration=out_duration)
-                # Ignore the flicker of a head turn; a glance away is not an
-                # event worth putting in front of a hiring manager.
-                if proctoring and out_duration >= 2.0:
-                    proctoring.record(
-                        "face_out_of_view", duration=round(out_duration, 1)
-                    )
-                print(f"[LOG] Out of frame duration: {out_duration:.2f}s")
-                await websocket.send_text("face_in_frame")
+    Shared by /ws/video and the video channel of /ws/interview/{id}: frames
+    arrive in `mailbox` however they were carried, and replies - verdict
+    strings and capture-rate dicts - go out through the coroutine `send`.
+    The caller takes the stream's `lease` on `pool` and releases it.
+    """
+    # Tells the client how often to capture, and at what width. A device
+    # check is told once, up front, to go slow and small.
+    capture = None if device_check else CaptureRateController()
+    dropped_seen = 0
+    if device_check:
+        await send({
+            "type": "capture",
+            "interval_ms": config.video.device_check_interval_ms,
+            "width": REDUCED_WIDTH,
+        })
 
-            if eyes_detected and face_in_center:
-                await websocket.send_text("face_in_frame")
+    # The in-view / out-of-view timeline, kept as runs rather than per frame,
+    # and - while in view - where the candidate was looking.
+    intervals = StateIntervals()
+    gaze = StateIntervals()
+    last_reply_at = 0.0
+
+    # The last few seconds of small keyframes, frozen to disk when an event
+    # fires so the report has something a reviewer can look at.
+    evidence = EvidenceBuffer(session_id) if proctoring else None
+    out_of_view_evidence: Optional[List[str]] = None
+    multiple_faces_at = 0.0
+
+    def close_interval(interval: Optional[Interval], note: Optional[str] = None):
+        nonlocal out_of_view_evidence
+        if interval is None:
+            return
+        write_log(session_id, interval)
+        detail = {"note": note} if note else {}
+        if interval.state == OUT_OF_VIEW and out_of_view_evidence:
+            detail["evidence"] = out_of_view_evidence
+            out_of_view_evidence = None
+        if interval.state == LOOKING_AWAY:
+            if proctoring and interval.duration >= LOOKING_AWAY_MIN_SECONDS:
+                proctoring.record(
+                    "looking_away", duration=round(interval.duration, 1), **detail
+                )
+            return
+        if interval.state != OUT_OF_VIEW:
+            return
+        # Ignore the flicker of a head turn; a glance away is not an
+        # event worth putting in front of a hiring manager.
+        if proctoring and interval.duration >= 2.0:
+            proctoring.record(
+                "face_out_of_view", duration=round(interval.duration, 1), **detail
+            )
+        print(f"[LOG] Out of frame duration: {interval.duration:.2f}s")
+
+    try:
+        while True:
+            frame_bytes = await mailbox.get()
+            if frame_bytes is None:
+                break
+            # Decode and inference happen in a worker process; this coroutine
+            # just waits, so other sessions' traffic keeps flowing meanwhile.
+            verdict = await pool.analyze(frame_bytes, lease)
+            if verdict is None:
+                continue
+            keyframe = verdict.pop("evidence_jpeg", None)
+            if evidence and keyframe:
+                evidence.add(keyframe)
+            if verdict.get("reused"):
+                frame_stats.reused += 1
             else:
-                await websocket.send_text("face_out_of_frame")
+                tier = verdict.get("tier", "facemesh")
+                frame_stats.tiers[tier] = frame_stats.tiers.get(tier, 0) + 1
+
+            in_view = verdict["eyes_detected"] and verdict["face_in_center"]
+            state = IN_VIEW if in_view else OUT_OF_VIEW
+            changed = state != intervals.state
+            close_interval(intervals.observe(state))
+            if in_view:
+                close_interval(gaze.observe(
+                    LOOKING_AWAY if verdict.get("looking_away") else ON_SCREEN
+                ))
+            else:
+                close_interval(gaze.finish())
+
+            if evidence:
+                # Frozen once an absence has lasted long enough to become an
+                # event: the ring then holds the moments before they left.
+                if (
+                    state == OUT_OF_VIEW
+                    and out_of_view_evidence is None
+                    and time.time() - intervals.since >= 2.0
+                ):
+                    out_of_view_evidence = await asyncio.to_thread(
+                        evidence.freeze, "out_of_view"
+                    )
+                faces = verdict.get("faces", 0)
+                if faces > 1 and time.monotonic() - multiple_faces_at >= MULTIPLE_FACES_COOLDOWN_SECONDS:
+                    multiple_faces_at = time.monotonic()
+                    files = await asyncio.to_thread(evidence.freeze, "multiple_faces")
+                    proctoring.record("multiple_faces", faces=faces, evidence=files or None)
+
+            # Only a change is news to the client. The heartbeat is there so
+            # a missed message cannot leave its indicator wrong for long.
+            now = time.monotonic()
+            if changed or now - last_reply_at >= VERDICT_HEARTBEAT_SECONDS:
+                await send("face_in_frame" if in_view else "face_out_of_frame")
+                last_reply_at = now
+
+            if capture:
+                rate = capture.update(
+                    in_view=in_view,
+                    dropped_frames=mailbox.dropped > dropped_seen,
+                    pool_stats=pool.stats(),
+                )
+                dropped_seen = mailbox.dropped
+                if rate:
+                    await send(rate)
 
     except Exception as e:
         print("Disconnected:", e)
 
     finally:
-        # The candidate was still out of frame when the socket dropped, so the
-        # event never got its closing edge above.
-        if out_of_view and out_start_time:
-            total_duration = time.time() - out_start_time
-            write_log("Out of view", duration=total_duration)
-            if proctoring and total_duration >= 2.0:
-                proctoring.record(
-                    "face_out_of_view",
-                    duration=round(total_duration, 1),
-                    note="still out of view when the camera feed ended",
-                )
+        if mailbox.dropped:
+            print(
+                f"🎥 Stream {session_id or 'device-check'}: dropped {mailbox.dropped} "
+                f"of {mailbox.received} frame(s) to stay current"
+            )
+
+        # The last run never got its closing edge; if the candidate was out
+        # of frame when the socket dropped, that is worth saying.
+        note = "still ongoing when the camera feed ended"
+        close_interval(gaze.finish(), note=note)
+        close_interval(intervals.finish(), note=note)
+
+
+@app.get("/api/metrics/video")
+async def video_metrics():
+    """Frame throughput for /ws/video: how much is analysed versus dropped
+    as stale, and how busy the worker pool is."""
+    return {
+        "frames": frame_stats.as_dict(),
+        "pool": video_pool.stats(),
+        "device_check_pool": device_check_pool.stats(),
+    }
 
 
 @app.get("/health")
@@ -821,105 +1161,402 @@ async def tavus_llm_completions(request: Request):
     )
 
 
-@app.post("/api/session/init", response_model=SessionInitResponse)
-async def initialize_session(request: SessionInitRequest):
+# How long a finished background init stays subscribable. Long enough for a
+# client that reconnects after a network blip; short enough not to accumulate.
+INIT_PROGRESS_TTL_SECONDS = 600
+
+# Strong references to running background inits. The event loop only keeps a
+# weak one, so an unreferenced task can be collected mid-flight.
+_background_tasks: set = set()
+
+
+async def _run_session_init(
+    session_id: str,
+    request: SessionInitRequest,
+    progress: Optional[InitProgress] = None,
+) -> SessionInitResponse:
     """
-    Initialize interview session
-    - Process resume
-    - Analyze against job description
-    - Create interview session
-    - Initialize avatar (if enabled)
+    The session init pipeline, shared by the blocking and background modes.
+
+    An interview token is claimed for this init before anything awaits (in
+    redeem()), so two concurrent inits cannot both spend it. The claim is
+    given back if the init fails, leaving the candidate free to retry, and
+    becomes a permanent redeemed mark only once the session is fully set up.
     """
+    token = request.interview_token
+    pal_task = None
+    if config.enable_avatar:
+        # Usually a no-op (pinned or cached), but a first-run PAL creation is
+        # a full Tavus round trip that has no reason to wait for the resume.
+        pal_task = asyncio.create_task(session_manager.ensure_tavus_pal())
+
     try:
-        print(f"\n📝 Initializing session for {request.job_role}...")
+        response = await _session_init_steps(session_id, request, progress, pal_task)
+    except BaseException:
+        if token:
+            preregistration.release(token)
+        raise
+    finally:
+        if pal_task is not None:
+            # However the init ended, the lookup must not outlive it - and a
+            # failure nobody awaited would only surface as a warning at exit.
+            pal_task.cancel()
+            await asyncio.gather(pal_task, return_exceptions=True)
+    if token:
+        await preregistration.mark_redeemed(token, response.session_id)
+    return response
 
-        # Step 1: Resume Evaluation
-        print("Step 1/4: Evaluating resume...")
-        resume_evaluator = ResumeEvaluatorAgent()
 
-        session_id = str(uuid.uuid4())
+async def _session_init_steps(
+    session_id: str,
+    request: SessionInitRequest,
+    progress: Optional[InitProgress] = None,
+    pal_task: Optional[asyncio.Task] = None,
+) -> SessionInitResponse:
+    """
+    The steps of a session init; see _run_session_init.
 
+    Work that does not depend on the resume is started up front so it overlaps
+    with the analysis instead of queueing behind it: the Tavus PAL is resolved
+    while Claude reads the resume, and the Tavus connection is opened while
+    the greeting is written.
+    """
+    def report(stage: str, **detail: Any) -> None:
+        if progress:
+            progress.publish(stage, **detail)
+
+    job_role = request.job_role
+    print(f"\n📝 Initializing session for {job_role or 'a pre-registered candidate'}...")
+
+    # Step 1: Resume Evaluation
+    print("Step 1/4: Evaluating resume...")
+    resume_evaluator = ResumeEvaluatorAgent()
+
+    if request.interview_token:
+        # Analysed ahead of time: only filing it under this session is
+        # left to do. Waits if the queue has not finished with it yet.
+        report("loading_preregistration")
+        record = await preregistration.redeem(request.interview_token)
+        resume_result = record["result"]
+        job_role = job_role or record.get("job_role")
+        resume_evaluator.save_analysis(
+            {
+                key: resume_result[key]
+                for key in ("analysis", "resume_text", "job_description", "model_used")
+            },
+            session_id,
+        )
+        report("analysis_ready")
+    else:
         resume_result = await resume_evaluator.process_resume(
             resume_pdf_base64=request.resume_base64,
             job_description=request.job_description,
-            session_id=session_id
+            session_id=session_id,
+            progress=report,
         )
 
-        resume_analysis = resume_result["analysis"]
+    resume_analysis = resume_result["analysis"]
+    job_role = job_role or "Unspecified role"
+
+    # The resume is the source of truth for the candidate's name; the
+    # request value is only a fallback for resumes with no name on them.
+    candidate_name = (
+        resume_result.get("candidate_name")
+        or (request.candidate_name or "").strip()
+        or "Candidate"
+    )
+    candidate_first_name = (
+        resume_result.get("candidate_first_name")
+        or candidate_name.split()[0]
+    )
+
+    # Step 2: Create Interviewer Agent
+    print("Step 2/4: Creating interviewer agent...")
+    interviewer_agent = InterviewerAgent(
+        resume_analysis=resume_analysis,
+        candidate_first_name=candidate_first_name
+    )
+
+    # Step 3: Create session
+    print("Step 3/4: Creating session...")
+    session_id = session_manager.create_session(
+        candidate_name=candidate_name,
+        job_role=job_role,
+        resume_analysis=resume_analysis,
+        interviewer_agent=interviewer_agent,
+        session_id=session_id
+    )
 
-        # The resume is the source of truth for the candidate's name; the
-        # request value is only a fallback for resumes with no name on them.
-        candidate_name = (
-            resume_result.get("candidate_name")
-            or (request.candidate_name or "").strip()
-            or "Candidate"
+    # The agent writes its own transcript, so it needs the id from the
+    # moment the interview starts - not from the first code submission,
+    # which is where it used to be set and which never happens at all for
+    # a candidate who skips the coding round.
+    interviewer_agent.session_id = session_id
+
+    # Save session info
+    session = session_manager.get_session(session_id)
+    session["session_id"] = session_id
+    report("session_created")
+
+    # Step 4: Initialize Avatar (if enabled)
+    avatar_url = None
+    avatar_conversation_id = None
+    if config.enable_avatar:
+        print("Step 4/4: Initializing avatar...")
+        if pal_task:
+            await pal_task
+        # Generate the opening now and hand it to Tavus as the greeting:
+        # the avatar then opens the interview itself the moment the
+        # candidate joins, with no "Start Interview" round trip.
+        opening, _ = await asyncio.gather(
+            open_interview(interviewer_agent, job_role),
+            session_manager.warm_tavus(),
         )
-        candidate_first_name = (
-            resume_result.get("candidate_first_name")
-            or candidate_name.split()[0]
+        session["opening"] = opening
+        report("greeting_ready")
+        avatar = await session_manager.create_tavus_conversation(
+            session_id, greeting=opening
         )
+        if avatar:
+            avatar_url = avatar["url"]
+            avatar_conversation_id = avatar["conversation_id"]
+            report("avatar_ready")
+
+    print(f"✅ Session initialized for {candidate_name}: {session_id}\n")
+
+    return SessionInitResponse(
+        session_id=session_id,
+        status="ready",
+        message="Interview session initialized successfully",
+        avatar_url=avatar_url,
+        avatar_conversation_id=avatar_conversation_id,
+        candidate_name=candidate_name,
+        candidate_first_name=candidate_first_name
+    )
+
 
-        # Step 2: Create Interviewer Agent
-        print("Step 2/4: Creating interviewer agent...")
-        interviewer_agent = InterviewerAgent(
-            resume_analysis=resume_analysis,
-            candidate_first_name=candidate_first_name
+async def _run_background_init(
+    session_id: str,
+    request: SessionInitRequest,
+    progress: InitProgress,
+) -> None:
+    """Run the pipeline for a background init, ending on a terminal stage."""
+    try:
+        response = await _run_session_init(session_id, request, progress)
+        progress.publish("ready", **response.model_dump())
+    except Exception as e:
+        print(f"❌ Error initializing session: {e}")
+        progress.publish("failed", detail=str(e))
+    finally:
+        asyncio.get_running_loop().call_later(
+            INIT_PROGRESS_TTL_SECONDS,
+            session_manager.init_jobs.pop, session_id, None,
         )
 
-        # Step 3: Create session
-        print("Step 3/4: Creating session...")
-        session_id = session_manager.create_session(
-            candidate_name=candidate_name,
-            job_role=request.job_role,
-            resume_analysis=resume_analysis,
-            interviewer_agent=interviewer_agent,
-            session_id=session_id
+
+def _digest(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        # Separator, so ("ab", "c") and ("a", "bc") hash differently.
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _init_payload_digest(request: SessionInitRequest) -> str:
+    """
+    Everything that makes two init requests the same interview: resume (or
+    its token), job description, role, mode.
+    """
+    return _digest(
+        request.interview_token or request.resume_base64 or "",
+        request.job_description or "",
+        request.job_role or "",
+        "background" if request.background else "blocking",
+    )
+
+
+def _init_idempotency_key(
+    request: SessionInitRequest, header_key: Optional[str], payload: str
+) -> str:
+    """
+    The key duplicate inits are matched on.
+
+    An explicit key wins; the endpoint checks it is not being reused for a
+    different `payload`. Otherwise the key is the payload digest plus the
+    client's nonce, so the same candidate deliberately starting over from a
+    fresh page still gets a fresh session.
+    """
+    explicit = (header_key or request.idempotency_key or "").strip()
+    if explicit:
+        return f"key:{explicit}"
+    return f"derived:{_digest(payload, request.client_nonce or '')}"
+
+
+@app.post("/api/session/init", response_model=SessionInitResponse)
+async def initialize_session(
+    request: SessionInitRequest,
+    idempotency_key: Optional[str] = Header(default=None),
+):
+    """
+    Initialize interview session
+    - Process resume
+    - Analyze against job description
+    - Create interview session
+    - Initialize avatar (if enabled)
+
+    With `background` set, this returns as soon as the session id exists,
+    with status "initializing", and the steps above report their progress on
+    GET /api/session/{session_id}/progress. The candidate can get on with the
+    device check instead of watching a spinner for the whole analysis.
+    """
+    if not request.interview_token and not (
+        request.resume_base64 and request.job_description and request.job_role
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail="Send resume_base64, job_description and job_role, or an interview_token",
         )
 
-        # The agent writes its own transcript, so it needs the id from the
-        # moment the interview starts - not from the first code submission,
-        # which is where it used to be set and which never happens at all for
-        # a candidate who skips the coding round.
-        interviewer_agent.session_id = session_id
+    payload = _init_payload_digest(request)
+    key = _init_idempotency_key(request, idempotency_key, payload)
 
-        # Save session info
-        session = session_manager.get_session(session_id)
-        session["session_id"] = session_id
-        
-        # Step 4: Initialize Avatar (if enabled)
-        avatar_url = None
-        avatar_conversation_id = None
-        if config.enable_avatar:
-            print("Step 4/4: Initializing avatar...")
-            # Generate the opening now and hand it to Tavus as the greeting:
-            # the avatar then opens the interview itself the moment the
-            # candidate joins, with no "Start Interview" round trip.
-            opening = await asyncio.to_thread(interviewer_agent.start_interview)
-            session["opening"] = opening
-            avatar = await session_manager.create_tavus_conversation(
-                session_id, greeting=opening
-            )
-            if avatar:
-                avatar_url = avatar["url"]
-                avatar_conversation_id = avatar["conversation_id"]
+    # A key reused for a different resume or job description is a client
+    # bug; handing back the first session would hide it.
+    if session_manager.init_payload(key) not in (None, payload):
+        raise HTTPException(
+            status_code=422,
+            detail="This idempotency key was already used for a different request",
+        )
+
+    # A late duplicate: the first request already finished.
+    cached = session_manager.cached_init(key)
+    if cached:
+        print(f"↩️  Duplicate session init - returning session {cached.session_id[:8]}")
+        return cached
+
+    # A concurrent duplicate: wait for the first request rather than racing it.
+    inflight = session_manager.init_inflight.get(key)
+    if inflight:
+        print("↩️  Duplicate session init in progress - waiting for it")
+        return await asyncio.shield(inflight[1])
+
+    future = asyncio.get_running_loop().create_future()
+    # Marks a failure as retrieved when no duplicate was waiting on it, which
+    # would otherwise be logged as an unhandled exception.
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    session_manager.init_inflight[key] = (payload, future)
+    try:
+        response = await _start_session_init(request)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    except BaseException:
+        # Cancelled: duplicates must not wait forever on a future no one
+        # will resolve.
+        future.cancel()
+        raise
+    else:
+        session_manager.remember_init(key, payload, response)
+        future.set_result(response)
+        return response
+    finally:
+        session_manager.init_inflight.pop(key, None)
 
-        print(f"✅ Session initialized for {candidate_name}: {session_id}\n")
+
+async def _start_session_init(request: SessionInitRequest) -> SessionInitResponse:
+    """Run the init in the requested mode; the endpoint handles deduplication."""
+    session_id = str(uuid.uuid4())
+
+    if request.background:
+        progress = InitProgress(session_id)
+        session_manager.init_jobs[session_id] = progress
+        task = asyncio.create_task(
+            _run_background_init(session_id, request, progress)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
 
         return SessionInitResponse(
             session_id=session_id,
-            status="ready",
-            message="Interview session initialized successfully",
-            avatar_url=avatar_url,
-            avatar_conversation_id=avatar_conversation_id,
-            candidate_name=candidate_name,
-            candidate_first_name=candidate_first_name
+            status="initializing",
+            message="Interview session is being prepared",
+            # Not known until the resume has been read; arrives with the
+            # "candidate_identified" and "ready" progress events.
+            candidate_name=(request.candidate_name or "").strip(),
+            candidate_first_name="",
         )
-    
+
+    try:
+        return await _run_session_init(session_id, request)
+    except PreRegistrationError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
     except Exception as e:
         print(f"❌ Error initializing session: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/session/{session_id}/progress")
+async def session_init_progress(session_id: str):
+    """
+    Server-sent events for a background session init.
+
+    Each event is one JSON object with a `stage`: reading_resume, resume_read,
+    candidate_identified, analysis_ready, session_created, greeting_ready,
+    avatar_ready, then "ready" (carrying the same fields /api/session/init
+    returns in blocking mode) or "failed" (carrying `detail`). Earlier stages
+    are replayed, so subscribing late loses nothing.
+    """
+    progress = session_manager.init_jobs.get(session_id)
+    if not progress:
+        raise HTTPException(status_code=404, detail="No session init in progress")
+
+    async def event_stream():
+        async for event in progress.subscribe():
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/api/candidates/preregister")
+async def preregister_candidate(request: PreRegisterRequest):
+    """
+    Submit a resume and job description ahead of the interview.
+
+    The analysis runs in a background queue; the returned interview token is
+    redeemed at /api/session/init in place of the resume, at which point the
+    analysis is already done. Keep the token private - it stands in for the
+    candidate's resume.
+    """
+    if not request.resume_base64.strip() or not request.job_description.strip():
+        raise HTTPException(status_code=400, detail="Resume and job description are required")
+
+    record = await preregistration.submit(
+        resume_base64=request.resume_base64,
+        job_description=request.job_description,
+        job_role=request.job_role,
+        candidate_name=request.candidate_name,
+    )
+    print(f"📥 Pre-registered a resume for {request.job_role}")
+    return {
+        "interview_token": record["token"],
+        "status": record["status"],
+    }
+
+
+@app.get("/api/candidates/preregister/{token}")
+async def preregistration_status(token: str):
+    """Where a pre-registered resume got to: queued, processing, ready, failed, redeemed."""
+    record = preregistration.status(token)
+    if not record:
+        raise HTTPException(status_code=404, detail="Unknown interview token")
+    return record
+
+
 @app.post("/api/job-description/extract")
 async def extract_job_description(request: JobDescriptionRequest):
     """
@@ -1007,7 +1644,7 @@ async def start_interview(session_id: str):
         opening = session.get("opening")
         if not opening:
             interviewer = session["interviewer_agent"]
-            opening = await asyncio.to_thread(interviewer.start_interview)
+            opening = await open_interview(interviewer, session.get("job_role", ""))
             session["opening"] = opening
 
         return {
@@ -1050,6 +1687,27 @@ async def process_message(request: InterviewMessage):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _record_code_submission(session: Dict[str, Any], session_id: str, code: str) -> bool:
+    """
+    Record a code submission - the checks and bookkeeping shared by every
+    route one can arrive on. Blocking (the interviewer autosaves its
+    transcript), so the socket handlers run it in a thread.
+
+    Returns:
+        True if it was recorded as an attempt.
+
+    Raises:
+        HTTPException: 400 if the interview has not reached a coding question
+    """
+    if not session.get("coding_question"):
+        raise HTTPException(status_code=400, detail="No coding question found")
+
+    accepted = session["interviewer_agent"].record_code_submission(code, session_id)
+    if accepted:
+        session["coding_submitted"] = True
+    return accepted
+
+
 @app.post("/api/interview/code/submit")
 async def submit_code(request: CodingSubmission):
     """
@@ -1059,18 +1717,13 @@ async def submit_code(request: CodingSubmission):
         session = session_manager.get_session(request.session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
-        
-        coding_question = session.get("coding_question")
-        if not coding_question:
-            raise HTTPException(status_code=400, detail="No coding question found")
 
         # Submitting only records the solution. The interviewer responds to the
         # candidate's spoken explanation of it on their next turn, assessing
         # code and explanation together - so no scoring happens here, and none
         # is returned: telling a candidate their score mid-interview would
         # change how they answer everything that follows.
-        interviewer = session["interviewer_agent"]
-        accepted = interviewer.record_code_submission(request.code, request.session_id)
+        accepted = _record_code_submission(session, request.session_id, request.code)
 
         # An empty editor or "idk" is not an attempt. Reporting it as received
         # would lock the editor behind a "Submitted" state the candidate
@@ -1084,8 +1737,6 @@ async def submit_code(request: CodingSubmission):
                 )
             }
 
-        session["coding_submitted"] = True
-
         return {
             "status": "received",
             "message": "Solution received - walk the interviewer through your logic."
@@ -1158,25 +1809,206 @@ async def record_proctoring_event(event: ProctoringEvent):
     handlers like `visibilitychange`, and a rejected request there would
     surface as a console error in the middle of someone's interview.
     """
-    session = session_manager.get_session(event.session_id)
-    if not session:
+    proctoring = _session_proctoring(event.session_id)
+    if not proctoring:
         return {"status": "ignored"}
+    if not proctoring.admit():
+        return {"status": "rate_limited"}
+    _record_browser_event(proctoring, event)
+    return {"status": "recorded"}
+
+
+class ProctoringEventItem(BaseModel):
+    # Per page load, increasing; with `client`, what makes a resend harmless.
+    seq: Optional[int] = None
+    type: str
+    # Client clock, epoch milliseconds, when the event happened.
+    at: Optional[float] = None
+    duration: Optional[float] = None
+    chars: Optional[int] = None
+    keystrokes: Optional[int] = None
+    source: Optional[str] = None
+
+
+class ProctoringEventBatch(BaseModel):
+    session_id: str
+    # Random per page load, so a reload's seq 1 is not a duplicate.
+    client: str = ""
+    # Client clock, epoch milliseconds, when the batch left.
+    sent_at: Optional[float] = None
+    events: List[ProctoringEventItem] = []
 
+
+# Far more than a browser buffers between flushes; anything bigger is not ours.
+MAX_EVENTS_PER_BATCH = 500
+
+
+def _session_proctoring(session_id: str) -> Optional[ProctoringLog]:
+    """The session's proctoring log, created on first use; None for an unknown session."""
+    session = session_manager.get_session(session_id)
+    if not session:
+        return None
     proctoring = session.get("proctoring")
     if not proctoring:
-        proctoring = session["proctoring"] = ProctoringLog(event.session_id)
+        proctoring = session["proctoring"] = ProctoringLog(session_id)
+    return proctoring
+
+
+# Browser-supplied strings are stored per event; keep them short.
+MAX_EVENT_TEXT = 64
 
+
+def _record_browser_event(proctoring: ProctoringLog, event, at: Optional[float] = None) -> None:
     if event.type == "keystrokes":
         proctoring.record_keystrokes(event.keystrokes or 0)
     else:
         proctoring.record(
-            event.type,
+            event.type[:MAX_EVENT_TEXT],
+            at=at,
             duration=event.duration,
             chars=event.chars,
-            source=event.source,
+            source=event.source[:MAX_EVENT_TEXT] if event.source else None,
         )
 
-    return {"status": "recorded"}
+
+@app.post("/api/interview/events")
+async def record_proctoring_events(request: Request):
+    """
+    Record a batch of integrity events observed in the browser.
+
+    The page used to make one request per tab switch, paste and keystroke
+    batch; now it buffers events and sends them a few seconds at a time, and
+    its last batch goes out with navigator.sendBeacon when the page is hidden
+    or unloaded - the moment a plain fetch is most likely to be cancelled.
+
+    sendBeacon cannot set a JSON content type (and a JSON one would need a
+    CORS preflight that an unloading page never completes), so the body is
+    read as raw JSON whatever the Content-Type says.
+
+    Events carry a sequence number per page load; one already recorded is
+    skipped, so a batch can be resent safely. Event times are the client's,
+    shifted by the gap between its clock and ours at `sent_at`.
+
+    Each session has a token bucket (see ProctoringLog.admit), so a buggy
+    or scripted client cannot flood it: events past the rate are dropped and
+    counted, and the log itself stays bounded in memory.
+
+    Forgiving in the same way as /api/interview/event: an unknown session is
+    a no-op, and a malformed body is reported but never retried.
+    """
+    try:
+        batch = ProctoringEventBatch.model_validate_json(await request.body())
+    except ValueError:
+        return JSONResponse(status_code=400, content={"status": "invalid"})
+
+    proctoring = _session_proctoring(batch.session_id)
+    if not proctoring:
+        return {"status": "ignored"}
+    return _ingest_event_batch(proctoring, batch)
+
+
+def _ingest_event_batch(proctoring: ProctoringLog, batch: ProctoringEventBatch) -> Dict[str, Any]:
+    """Record a batch's new events, as far as the session's rate limit allows."""
+    client = batch.client[:MAX_EVENT_TEXT]
+    offered = batch.events[:MAX_EVENTS_PER_BATCH]
+    fresh, in_batch = [], set()
+    for event in offered:
+        if event.seq is not None:
+            if event.seq in in_batch or proctoring.delivered(client, event.seq):
+                continue
+            in_batch.add(event.seq)
+        fresh.append(event)
+    # The session's token bucket decides how many of the new ones count;
+    # the rest are dropped, and counted as dropped.
+    allowed = proctoring.admit(len(fresh)) if fresh else 0
+
+    skew = time.time() - batch.sent_at / 1000 if batch.sent_at else 0.0
+    for event in fresh[:allowed]:
+        # Marked as delivered only now it is admitted: one the bucket turned
+        # away is not a duplicate if it comes again.
+        if event.seq is not None:
+            proctoring.mark_delivered(client, event.seq)
+        at = event.at / 1000 + skew if event.at else None
+        _record_browser_event(proctoring, event, at=at)
+
+    return {
+        "status": "recorded",
+        "recorded": allowed,
+        "duplicates": len(offered) - len(fresh),
+        "rate_limited": len(fresh) - allowed,
+    }
+
+
+class CodeRevision(BaseModel):
+    session_id: str
+    # The revision this delta was made against - the last one acknowledged.
+    base: int = 0
+    # One splice: at `pos`, remove `remove` characters and insert `insert`.
+    # Positions and counts are in code points, not UTF-16 units.
+    pos: int = 0
+    remove: int = 0
+    insert: str = ""
+    # The text's length after the splice, in code points. A mismatch means
+    # the two copies drifted, and is answered with a resync.
+    length: Optional[int] = None
+    # The whole text instead of a delta: the first revision, or after the
+    # server asked for a resync.
+    text: Optional[str] = None
+
+
+def _apply_code_revision(session: Dict[str, Any], session_id: str, revision: CodeRevision) -> Dict[str, Any]:
+    """
+    Record one editor revision. "resync" means the delta did not apply to
+    the server's copy and the client should send the whole text next.
+    """
+    log = session.get("code_revisions")
+    if log is None:
+        log = session["code_revisions"] = CodeRevisionLog(session_id)
+    # Same budget as every other browser event, so the editor cannot be
+    # used to get round it.
+    if not _session_proctoring(session_id).admit():
+        return {"status": "rate_limited", "rev": log.rev}
+    now = time.time()
+    if revision.text is not None:
+        applied = log.snapshot(now, revision.text)
+    else:
+        applied = log.apply(
+            revision.base, now, revision.pos, revision.remove, revision.insert, revision.length
+        )
+    return {"status": "recorded" if applied else "resync", "rev": log.rev}
+
+
+@app.post("/api/interview/code/revision")
+async def record_code_revision(revision: CodeRevision):
+    """
+    Record the code editor's contents as a delta against the last revision.
+
+    The interview page sends one every few seconds while the editor is open,
+    so the report can say how the solution was written, not only what was
+    submitted (see agents/code_revisions.py). Forgiving like the event
+    endpoints: an unknown session is a no-op.
+    """
+    session = session_manager.get_session(revision.session_id)
+    if not session:
+        return {"status": "ignored"}
+    return _apply_code_revision(session, revision.session_id, revision)
+
+
+@app.get("/api/interview/{session_id}/code-timeline")
+async def code_timeline(session_id: str, rev: Optional[int] = None):
+    """
+    The coding round's history for a reviewer: characters added and removed
+    per revision over time, and with `rev`, the exact text at that revision.
+    Rebuilt from the revision file, so it works after the session has ended.
+    """
+    log, points = await asyncio.to_thread(CodeRevisionLog.replay, session_id, rev)
+    if log is None:
+        raise HTTPException(status_code=404, detail="No code revisions for this session")
+    result: Dict[str, Any] = {"summary": log.summary(), "revisions": points}
+    if rev is not None:
+        result["rev"] = log.rev
+        result["text"] = log.text
+    return result
 
 
 @app.post("/api/interview/end")
@@ -1218,8 +2050,8 @@ async def end_interview(request: EndInterviewRequest, background: BackgroundTask
         interviewer.save_transcript(request.session_id)
 
         # Must land before the report task is queued: the generator reads
-        # proctoring.json off disk, so an unsaved log means a report with no
-        # integrity section. Failures are swallowed for the same reason the
+        # the proctoring journal off disk, so an unflushed one means a report
+        # with a partial integrity section. Failures are swallowed for the same reason the
         # transcript's are - this is the last step of a finished interview.
         proctoring = session.get("proctoring")
         if proctoring:
@@ -1284,6 +2116,38 @@ async def report_status(session_id: str):
     }
 
 
+def handle_control_message(session: Dict[str, Any], session_id: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    One message from a control channel - /ws/{session_id} or channel 0 of
+    /ws/interview/{session_id} - and the reply to send back, if any.
+    """
+    if data.get("type") == "message":
+        # Process interview message
+        interviewer = session["interviewer_agent"]
+        result = interviewer.get_next_question(data.get("content", ""))
+
+        return {
+            "type": "response",
+            "content": result["question"],
+            "is_coding_question": result["is_coding_question"],
+            "question_number": result["question_number"]
+        }
+
+    if data.get("type") == "code_submit":
+        # Same contract as POST /api/interview/code/submit: record the
+        # solution, say nothing about its quality. The interviewer
+        # assesses it when the candidate explains their logic aloud.
+        try:
+            accepted = _record_code_submission(session, session_id, data.get("code", ""))
+        except HTTPException as e:
+            # A refusal, not a fault: the channel stays open for what follows.
+            return {"type": "error", "detail": e.detail}
+
+        return {"type": "code_received" if accepted else "code_empty"}
+
+    return None
+
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """
@@ -1307,29 +2171,9 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         while True:
             # Receive message from client
             data = await websocket.receive_json()
-            
-            if data.get("type") == "message":
-                # Process interview message
-                interviewer = session["interviewer_agent"]
-                result = interviewer.get_next_question(data.get("content", ""))
-                
-                await websocket.send_json({
-                    "type": "response",
-                    "content": result["question"],
-                    "is_coding_question": result["is_coding_question"],
-                    "question_number": result["question_number"]
-                })
-            
-            elif data.get("type") == "code_submit":
-                # Same contract as POST /api/interview/code/submit: record the
-                # solution, say nothing about its quality. The interviewer
-                # assesses it when the candidate explains their logic aloud.
-                session["interviewer_agent"].record_code_submission(
-                    data.get("code", ""), session_id
-                )
-                session["coding_submitted"] = True
-
-                await websocket.send_json({"type": "code_received"})
+            reply = handle_control_message(session, session_id, data)
+            if reply:
+                await websocket.send_json(reply)
     
     except WebSocketDisconnect:
         print(f"WebSocket disconnected: {session_id}")
@@ -1345,6 +2189,141 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             session["control_ws"] = None
 
 
+# Inbound backlog per channel of /ws/interview/{id}, in messages. Video needs
+# none: its mailbox keeps only the newest frame.
+MUX_QUEUE_LIMITS = {CONTROL: 16, EVENTS: 8, CODE: 8}
+
+
+@app.websocket("/ws/interview/{session_id}")
+async def interview_stream(websocket: WebSocket, session_id: str):
+    """
+    Everything a live interview streams, on one socket.
+
+    Camera frames, control messages, integrity event batches and code
+    submissions share one connection, each frame tagged with a one-byte
+    channel id (see tracking/multiplex.py). Each channel has its own bounded
+    backlog and consumer, so a flood of events cannot hold up a frame or a
+    question. /ws/video, /ws/{session_id}, /api/interview/events and
+    /api/interview/code/submit stay for clients that do not use it.
+
+    Rate limits apply here exactly as over HTTP: event batches go through
+    the session's token bucket, and an event batch that finds its channel
+    backlog full is dropped and counted as rate-limited.
+    """
+    await websocket.accept()
+    session = session_manager.get_session(session_id)
+    if not session:
+        await websocket.close(code=1008, reason="Session not found")
+        return
+    proctoring = _session_proctoring(session_id)
+
+    sender = MuxSender(websocket)
+    sender.start()
+    session["control_ws"] = sender.channel(CONTROL)
+
+    lease = video_pool.lease()
+    mailbox = FrameMailbox()
+    queues = {channel: ChannelQueue(limit) for channel, limit in MUX_QUEUE_LIMITS.items()}
+
+    async def read_frames():
+        try:
+            while True:
+                channel, payload = decode(await websocket.receive_bytes())
+                if channel == VIDEO:
+                    mailbox.put(payload)
+                elif channel in queues:
+                    if not queues[channel].put(payload) and channel == EVENTS:
+                        proctoring.note_rate_limited(1)
+        except Exception as e:
+            print(f"Interview stream {session_id} closed: {e}")
+        finally:
+            mailbox.close()
+            for queue in queues.values():
+                queue.close()
+
+    def parse(payload: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    async def consume_control():
+        while (payload := await queues[CONTROL].get()) is not None:
+            data = parse(payload)
+            if data is None:
+                continue
+            try:
+                # get_next_question calls Claude; keep the loop free meanwhile.
+                reply = await asyncio.to_thread(handle_control_message, session, session_id, data)
+            except Exception as e:
+                print(f"Interview stream {session_id} control error: {e}")
+                reply = {"error": str(e)}
+            if reply:
+                sender.send(CONTROL, reply)
+
+    async def consume_events():
+        while (payload := await queues[EVENTS].get()) is not None:
+            data = parse(payload)
+            if data is None:
+                continue
+            try:
+                batch = ProctoringEventBatch.model_validate({**data, "session_id": session_id})
+            except ValueError:
+                continue
+            _ingest_event_batch(proctoring, batch)
+
+    async def consume_code():
+        while (payload := await queues[CODE].get()) is not None:
+            data = parse(payload)
+            if data is None:
+                continue
+            if data.get("type") == "revision":
+                try:
+                    revision = CodeRevision.model_validate({**data, "session_id": session_id})
+                except ValueError:
+                    continue
+                sender.send(CODE, {"type": "revision", **_apply_code_revision(session, session_id, revision)})
+                continue
+            try:
+                accepted = await asyncio.to_thread(
+                    _record_code_submission, session, session_id, data.get("code", "")
+                )
+            except HTTPException as e:
+                sender.send(CODE, {"type": "error", "detail": e.detail})
+                continue
+            except Exception as e:
+                print(f"Interview stream {session_id} code error: {e}")
+                continue
+            sender.send(CODE, {"type": "code_received" if accepted else "code_empty"})
+
+    async def send_video(message):
+        # Verdicts belong to the video channel; capture-rate settings are
+        # instructions to the client, and go out on control like the rest.
+        sender.send(CONTROL if isinstance(message, dict) else VIDEO, message)
+
+    reader = asyncio.create_task(read_frames())
+    try:
+        await asyncio.gather(
+            track_camera(session_id, proctoring, video_pool, lease, mailbox, send_video),
+            consume_control(),
+            consume_events(),
+            consume_code(),
+        )
+    finally:
+        reader.cancel()
+        video_pool.release(lease)
+        await sender.close()
+        if session.get("control_ws") is not None and getattr(session["control_ws"], "sender", None) is sender:
+            session["control_ws"] = None
+        dropped = {
+            CHANNEL_NAMES[channel]: queue.dropped
+            for channel, queue in queues.items() if queue.dropped
+        }
+        if dropped or sender.dropped:
+            print(f"📡 Interview stream {session_id}: dropped inbound {dropped}, outbound {sender.dropped}")
+
+
 if __name__ == "__main__":
     import socket
     import uvicorn
@@ -1395,6 +2374,7 @@ if __name__ == "__main__":
             str(SERVER_DIR / "agents"),
             str(SERVER_DIR / "config"),
             str(SERVER_DIR / "prompts"),
+            str(SERVER_DIR / "tracking"),
         ],
         app_dir=str(BACKEND_DIR),
         log_level="info"
@@ -18,8 +18,12 @@ BASE_DIR = Path(__file__).parent.parent
 # server/backend, or an IDE with its own working directory.
 LOGS_DIR = BASE_DIR / "logs"
 TRACKING_DIR = LOGS_DIR / "tracking"
+# Resumes submitted ahead of the interview, one record per interview token.
+PREREGISTER_DIR = LOGS_DIR / "preregistered"
 REPORTS_DIR = BASE_DIR / "reports"
 PROMPTS_DIR = BASE_DIR / "prompts"
+# Model weights that are too large for the repository (see tracking/detectors.py).
+MODELS_DIR = BASE_DIR / "models"
 
 # Anchor the .env lookup to server/ rather than the current working directory,
 # so the config resolves the same whether you launch from the repo root,
@@ -52,6 +56,18 @@ def env_int(name: str, default: int) -> int:
         return default
 
 
+def env_float(name: str, default: float) -> float:
+    """Read a float from the environment, falling back on blank/garbage values."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw.strip())
+    except ValueError:
+        print(f"Warning: {name}={raw!r} is not a number - using {default}")
+        return default
+
+
 # A Tavus stock face, so the avatar works before anyone trains their own.
 # Browse alternatives: GET https://tavusapi.com/v2/faces?face_type=system
 DEFAULT_TAVUS_FACE_ID = "rf4703150052"  # "Charlie"
@@ -209,6 +225,189 @@ class InterviewConfig(BaseModel):
         description="Effort level for conversational turns (low|medium|high)"
     )
 
+    # Opening greeting. "template" renders it locally from
+    # prompts.GREETING_TEMPLATES; "llm" has Claude write it, which costs a
+    # full model round trip before the avatar can start.
+    greeting_mode: str = Field(
+        default_factory=lambda: os.getenv("GREETING_MODE", "template").strip().lower(),
+        description="How the opening greeting is produced (template|llm)"
+    )
+
+    # How long a finished /api/session/init answers its duplicates (a retry
+    # or double-click) with the same session instead of creating another.
+    init_idempotency_ttl: int = Field(
+        default_factory=lambda: env_int("INIT_IDEMPOTENCY_TTL", 600),
+        description="Seconds a session init response is reused for duplicates"
+    )
+
+    # Pre-registration: resumes analysed ahead of interview time. A small
+    # number on purpose - the queue exists to spread a burst of submissions
+    # out, not to fire them all at the API at once.
+    preregister_workers: int = Field(
+        default_factory=lambda: env_int("PREREGISTER_WORKERS", 2),
+        description="Concurrent background analyses of pre-registered resumes"
+    )
+    # Bulk screening (agents/resume_screening.py) runs offline, so it can go
+    # wider - bounded only by the API rate limit.
+    screening_concurrency: int = Field(
+        default_factory=lambda: env_int("SCREENING_CONCURRENCY", 8),
+        description="Resumes in flight at once during bulk screening"
+    )
+
+
+def default_video_workers() -> int:
+    """One core left for the event loop, and no more than four by default."""
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+class VideoConfig(BaseModel):
+    """Camera-frame analysis for /ws/video"""
+    # Worker processes running face tracking, each with its own MediaPipe
+    # graph. 0 analyses on a thread in the server process instead.
+    workers: int = Field(
+        default_factory=lambda: env_int("VIDEO_WORKERS", default_video_workers()),
+        description="Video-analysis worker processes (0 = in-process)"
+    )
+    # FaceMesh graphs per worker, one leased to each open camera stream.
+    # Past this, the least recently active stream's graph is reclaimed.
+    trackers_per_worker: int = Field(
+        default_factory=lambda: env_int("VIDEO_TRACKERS_PER_WORKER", 8),
+        description="Face trackers each video worker keeps"
+    )
+    # Mean absolute change, in grey levels (0-255), between a stream's tiny
+    # thumbnails below which a frame counts as unchanged and reuses the last
+    # verdict. 0 disables the gate.
+    motion_threshold: float = Field(
+        default_factory=lambda: env_float("VIDEO_MOTION_THRESHOLD", 3.0),
+        description="Thumbnail change below which inference is skipped"
+    )
+    # However still the scene, a full inference runs at least this often.
+    full_check_seconds: float = Field(
+        default_factory=lambda: env_float("VIDEO_FULL_CHECK_SECONDS", 3.0),
+        description="Longest a reused verdict may go unverified"
+    )
+    # Capture intervals the server asks /ws/video clients for: around an
+    # out-of-view transition, while the candidate is steadily in view, and
+    # while the server is shedding frames.
+    capture_fast_ms: int = Field(
+        default_factory=lambda: env_int("VIDEO_CAPTURE_FAST_MS", 250),
+        description="Capture interval around view changes"
+    )
+    capture_steady_ms: int = Field(
+        default_factory=lambda: env_int("VIDEO_CAPTURE_STEADY_MS", 1500),
+        description="Capture interval while the candidate is steady"
+    )
+    capture_slow_ms: int = Field(
+        default_factory=lambda: env_int("VIDEO_CAPTURE_SLOW_MS", 2000),
+        description="Capture interval while the server is overloaded"
+    )
+    # Tracking logs are buffered and flushed by a background thread at least
+    # this often. A file past log_rotate_mb is gzipped aside, keeping the
+    # newest log_backups of them.
+    log_flush_seconds: float = Field(
+        default_factory=lambda: env_float("TRACKING_LOG_FLUSH_SECONDS", 2.0),
+        description="Longest a tracking record waits in memory"
+    )
+    log_rotate_mb: int = Field(
+        default_factory=lambda: env_int("TRACKING_LOG_ROTATE_MB", 20),
+        description="Size at which a tracking log is rotated (0 = never)"
+    )
+    log_backups: int = Field(
+        default_factory=lambda: env_int("TRACKING_LOG_BACKUPS", 5),
+        description="Rotated tracking logs kept per file"
+    )
+    # Shared-memory frame slots per worker, and their size. A frame larger
+    # than a slot, or one that arrives with every slot busy, is sent through
+    # the worker's queue instead. 0 slots always uses the queue.
+    shm_slots: int = Field(
+        default_factory=lambda: env_int("VIDEO_SHM_SLOTS", 8),
+        description="Shared-memory frame slots per video worker"
+    )
+    shm_slot_kb: int = Field(
+        default_factory=lambda: env_int("VIDEO_SHM_SLOT_KB", 512),
+        description="Size of one shared-memory frame slot, in KB"
+    )
+    # First-tier face detector: "dnn" (OpenCV's res10 SSD, batched across
+    # streams, FaceMesh only for unclear frames), "facemesh" (every frame),
+    # or "auto" - dnn when its model files are present.
+    detector: str = Field(
+        default_factory=lambda: os.getenv("VIDEO_DETECTOR", "auto").strip().lower(),
+        description="auto, dnn or facemesh"
+    )
+    dnn_prototxt: Path = Field(
+        default_factory=lambda: Path(os.getenv("VIDEO_DNN_PROTOTXT") or MODELS_DIR / "deploy.prototxt"),
+        description="res10 face detector network definition"
+    )
+    dnn_model: Path = Field(
+        default_factory=lambda: Path(
+            os.getenv("VIDEO_DNN_MODEL") or MODELS_DIR / "res10_300x300_ssd_iter_140000.caffemodel"
+        ),
+        description="res10 face detector weights"
+    )
+    # A DNN detection at least this confident is trusted on its own; weaker
+    # ones are escalated to FaceMesh.
+    dnn_confidence: float = Field(
+        default_factory=lambda: env_float("VIDEO_DNN_CONFIDENCE", 0.7),
+        description="Confidence above which FaceMesh is skipped"
+    )
+    # Most frames a worker takes from its queue for one detector pass.
+    batch_max: int = Field(
+        default_factory=lambda: env_int("VIDEO_BATCH_MAX", 16),
+        description="Frames per batched detection"
+    )
+    # Evidence keyframes: how far back a stream's in-memory ring reaches, and
+    # how much a session may write to logs/<session_id>/evidence/ in total.
+    evidence_seconds: float = Field(
+        default_factory=lambda: env_float("VIDEO_EVIDENCE_SECONDS", 6.0),
+        description="Seconds of recent keyframes kept per stream"
+    )
+    evidence_budget_kb: int = Field(
+        default_factory=lambda: env_int("VIDEO_EVIDENCE_BUDGET_KB", 1024),
+        description="Evidence written per session, at most"
+    )
+    # Device checks (/ws/video with no interview session) run on their own
+    # small pool, capped, at a fixed low frame rate.
+    device_check_workers: int = Field(
+        default_factory=lambda: env_int("VIDEO_DEVICE_CHECK_WORKERS", 1),
+        description="Worker processes for device checks (0 = in-process)"
+    )
+    device_check_max_streams: int = Field(
+        default_factory=lambda: env_int("VIDEO_DEVICE_CHECK_MAX_STREAMS", 16),
+        description="Device checks allowed at once"
+    )
+    device_check_interval_ms: int = Field(
+        default_factory=lambda: env_int("VIDEO_DEVICE_CHECK_INTERVAL_MS", 1000),
+        description="Capture interval asked of device-check clients"
+    )
+    # A frame with no verdict after this long is skipped rather than holding
+    # up the next one.
+    frame_timeout: float = Field(default=5.0, description="Seconds to wait for one frame's verdict")
+
+
+class ProctoringConfig(BaseModel):
+    """Limits on browser integrity telemetry, per interview session"""
+    # Token bucket: events admitted per second on average, and the burst a
+    # session may spend at once (a batch flushed on page hide, say).
+    event_rate: float = Field(
+        default_factory=lambda: env_float("PROCTORING_EVENT_RATE", 2.0),
+        description="Browser events admitted per second per session"
+    )
+    event_burst: int = Field(
+        default_factory=lambda: env_int("PROCTORING_EVENT_BURST", 60),
+        description="Browser events a session may send at once"
+    )
+    # Identical events this close together are stored once, with a count.
+    coalesce_seconds: float = Field(
+        default_factory=lambda: env_float("PROCTORING_COALESCE_SECONDS", 2.0),
+        description="Window for folding repeated identical events together"
+    )
+    # Past this, events are still counted but no longer stored one by one.
+    max_events: int = Field(
+        default_factory=lambda: env_int("PROCTORING_MAX_EVENTS", 2000),
+        description="Events stored per session"
+    )
+
+
 class EmailConfig(BaseModel):
     """Email Configuration"""
     smtp_server: str = Field(
@@ -230,11 +429,14 @@ class SystemConfig(BaseModel):
     server: ServerConfig = Field(default_factory=ServerConfig)
     conversation: ConversationConfig = Field(default_factory=ConversationConfig)
     interview: InterviewConfig = Field(default_factory=InterviewConfig)
+    video: VideoConfig = Field(default_factory=VideoConfig)
+    proctoring: ProctoringConfig = Field(default_factory=ProctoringConfig)
     email: EmailConfig = Field(default_factory=EmailConfig)
 
     # File paths
     logs_dir: Path = LOGS_DIR
     tracking_dir: Path = TRACKING_DIR
+    preregister_dir: Path = PREREGISTER_DIR
     reports_dir: Path = REPORTS_DIR
     prompts_dir: Path = PROMPTS_DIR
 
@@ -0,0 +1,68 @@
+"""
+The capture-rate controller's notion of a busy pool.
+
+"Busy" slows every stream down to half width, so it must not trip under
+ordinary load: many streams per worker, each with its one frame in flight.
+"""
+
+import sys
+import types
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+try:
+    import config.settings  # noqa: F401
+except ImportError:
+    # The settings need pydantic. capture_rate only needs `config` to exist
+    # at import; the fixture below supplies the values the tests use either
+    # way, so they run with or without it.
+    stub = types.ModuleType("config.settings")
+    stub.config = None
+    sys.modules["config.settings"] = stub
+
+from tracking import capture_rate
+from tracking.capture_rate import REDUCED_WIDTH, CaptureRateController, pool_busy
+
+
+@pytest.fixture(autouse=True)
+def video_config(monkeypatch):
+    monkeypatch.setattr(capture_rate, "config", SimpleNamespace(video=SimpleNamespace(
+        capture_fast_ms=500, capture_steady_ms=1000, capture_slow_ms=2000,
+    )))
+
+
+def stats(workers: int, streams: int, in_flight: int) -> dict:
+    return {"workers": workers, "streams": streams, "in_flight": in_flight, "frames_via_queue": 0}
+
+
+def test_one_frame_per_stream_is_not_busy():
+    # Ten streams on two workers, every one waiting on a verdict.
+    assert not pool_busy(stats(workers=2, streams=10, in_flight=10))
+
+
+def test_idle_pool_is_not_busy():
+    assert not pool_busy(stats(workers=2, streams=0, in_flight=0))
+
+
+def test_timed_out_frames_still_queued_are_busy():
+    assert pool_busy(stats(workers=2, streams=10, in_flight=11))
+
+
+def test_ordinary_load_keeps_full_width():
+    controller = CaptureRateController()
+    message = controller.update(
+        in_view=True, dropped_frames=False, pool_stats=stats(workers=1, streams=8, in_flight=8)
+    )
+    assert message["width"] != REDUCED_WIDTH
+
+
+def test_backlog_drops_to_reduced_width():
+    controller = CaptureRateController()
+    message = controller.update(
+        in_view=True, dropped_frames=False, pool_stats=stats(workers=1, streams=8, in_flight=12)
+    )
+    assert message["width"] == REDUCED_WIDTH
@@ -0,0 +1,32 @@
+"""
+render_greeting's reading of the job role: role words and their aliases
+count only as whole words.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from prompts.agent_prompts import render_greeting
+
+
+def test_alias_inside_a_longer_word_is_not_a_role():
+    # "back end" appears across "feedback endpoint"; it is not a backend role.
+    greeting = render_greeting("Ana", "Feedback Endpoint Engineer")
+    assert "backend" not in greeting
+    assert "today" in greeting
+
+
+def test_short_alias_inside_a_word_is_not_a_role():
+    # "sre" is inside "misread"; no DevOps interview here.
+    assert "DevOps" not in render_greeting("Ana", "Misread Claims Analyst")
+
+
+def test_alias_as_whole_words_names_the_role():
+    assert "for this backend interview" in render_greeting("Ana", "Senior Back End Engineer")
+    assert "for this DevOps interview" in render_greeting("Ana", "SRE")
+
+
+def test_unknown_role_is_today():
+    assert "today" in render_greeting("Ana", "Data Scientist")
@@ -0,0 +1,91 @@
+"""
+Server-chosen capture rate for a /ws/video stream.
+
+The browser used to push a 640x480 frame every 500ms no matter what: the
+same rate for a candidate sitting still for ten minutes as for one who has
+just walked out of shot, and the same rate whether the video workers were
+idle or drowning. The server is the side that knows both, so it now tells
+the client how often to capture and at what width, with a JSON text message
+on the same socket:
+
+    {"type": "capture", "interval_ms": 1000, "width": 640}
+
+The rate falls while the candidate is steadily in view, rises around an
+out-of-view transition - that is where event timing matters - and falls
+further, at half the width, while the server is shedding frames. A client
+that predates the message ignores it and keeps its fixed timer.
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+from config.settings import config
+
+
+# In view this long without a change before the stream drops to the steady rate.
+STEADY_AFTER_SECONDS = 10.0
+
+# Once overloaded, stay slow until this long has passed without a dropped frame,
+# so the rate does not flap on every other frame.
+OVERLOAD_HOLD_SECONDS = 5.0
+
+# Frames in flight per open stream beyond which the pool counts as busy. A
+# stream waits for each verdict before sending the next frame, so ordinary
+# load - however many streams share each worker - keeps at most one each.
+# Anything past that is frames the pool was too slow to answer in time and
+# is still working through.
+BUSY_IN_FLIGHT_PER_STREAM = 1
+
+FULL_WIDTH = 640
+REDUCED_WIDTH = 320
+
+
+def pool_busy(pool_stats: Dict[str, Any]) -> bool:
+    """Whether a VideoWorkerPool's stats() show it falling behind."""
+    streams = max(1, pool_stats.get("streams") or 1)
+    return pool_stats.get("in_flight", 0) > streams * BUSY_IN_FLIGHT_PER_STREAM
+
+
+class CaptureRateController:
+    """Picks the capture settings for one stream and says when they change."""
+
+    def __init__(self):
+        now = time.monotonic()
+        self.in_view = True
+        self.changed_at = now
+        self.overloaded_until = 0.0
+        self.current: Optional[Dict[str, int]] = None
+
+    def update(
+        self,
+        in_view: bool,
+        dropped_frames: bool,
+        pool_stats: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Feed in the latest verdict and load readings.
+
+        Returns:
+            The control message to send, or None if nothing has changed.
+        """
+        now = time.monotonic()
+        if in_view != self.in_view:
+            self.in_view = in_view
+            self.changed_at = now
+
+        if dropped_frames or pool_busy(pool_stats):
+            self.overloaded_until = now + OVERLOAD_HOLD_SECONDS
+
+        target = self._target(now)
+        if target == self.current:
+            return None
+        self.current = target
+        return {"type": "capture", **target}
+
+    def _target(self, now: float) -> Dict[str, int]:
+        video = config.video
+        if now < self.overloaded_until:
+            return {"interval_ms": video.capture_slow_ms, "width": REDUCED_WIDTH}
+        if not self.in_view or now - self.changed_at < STEADY_AFTER_SECONDS:
+            return {"interval_ms": video.capture_fast_ms, "width": FULL_WIDTH}
+        return {"interval_ms": video.capture_steady_ms, "width": FULL_WIDTH}
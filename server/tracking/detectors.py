@@ -0,0 +1,98 @@
+"""
+Face detectors for the video workers.
+
+FaceMesh answers "is the face centred, are the eyes visible" by fitting 478
+landmarks to one image at a time. Most frames need far less than that: a box
+around a face, and how sure the detector is. OpenCV's DNN face detector (the
+res10 300x300 SSD that ships with OpenCV's samples) gives exactly that, and
+unlike FaceMesh it takes a batch - so a worker can run the latest frames of
+every stream pinned to it through the network in one forward pass.
+
+The detector is the first tier. Frames it is sure about are decided on its
+box alone; frames it is unsure about - middling confidence, a face straddling
+the centre margin - go on to FaceMesh as before (see face_analysis.py). On a
+CPU-only node that trades a small accuracy delta on the easy frames for many
+more cameras per core.
+
+The model files are not in the repository. Put deploy.prototxt and
+res10_300x300_ssd_iter_140000.caffemodel (from OpenCV's
+samples/dnn/face_detector) under server/models/, or point VIDEO_DNN_PROTOTXT
+and VIDEO_DNN_MODEL at them. Without them every frame goes to FaceMesh.
+"""
+
+from typing import List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config.settings import config
+
+
+class Detection(NamedTuple):
+    """One face, as fractions of the frame."""
+    box: Tuple[float, float, float, float]
+    confidence: float
+
+
+class FaceDetector:
+    """A batch of frames in, the faces found in each out."""
+
+    name = "detector"
+
+    def detect(self, frames: List[np.ndarray]) -> List[List[Detection]]:
+        raise NotImplementedError
+
+
+class DnnFaceDetector(FaceDetector):
+    """OpenCV's res10 SSD face detector, batched with blobFromImages."""
+
+    name = "dnn"
+
+    INPUT_SIZE = (300, 300)
+    # The BGR means the model was trained with.
+    MEAN = (104.0, 177.0, 123.0)
+    # Below this a detection is not a face at all.
+    MIN_CONFIDENCE = 0.3
+
+    def __init__(self, prototxt: str, model: str):
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, model)
+
+    def detect(self, frames: List[np.ndarray]) -> List[List[Detection]]:
+        if not frames:
+            return []
+        blob = cv2.dnn.blobFromImages(frames, 1.0, self.INPUT_SIZE, self.MEAN)
+        self.net.setInput(blob)
+        # (1, 1, N, 7): image index, class, confidence, x0, y0, x1, y1 - for
+        # every detection across the whole batch.
+        rows = self.net.forward().reshape(-1, 7)
+        rows = rows[rows[:, 2] >= self.MIN_CONFIDENCE]
+
+        found: List[List[Detection]] = [[] for _ in frames]
+        for image, _, confidence, x0, y0, x1, y1 in rows:
+            box = tuple(float(v) for v in np.clip((x0, y0, x1, y1), 0.0, 1.0))
+            found[int(image)].append(Detection(box, float(confidence)))
+        for detections in found:
+            detections.sort(key=lambda d: d.confidence, reverse=True)
+        return found
+
+
+def create_detector() -> Optional[FaceDetector]:
+    """
+    The first-tier detector VIDEO_DETECTOR asks for, or None for FaceMesh
+    only. "auto" uses the DNN tier when its model files are present.
+    """
+    choice = config.video.detector
+    if choice == "facemesh":
+        return None
+
+    prototxt, model = config.video.dnn_prototxt, config.video.dnn_model
+    if not (prototxt.exists() and model.exists()):
+        if choice == "dnn":
+            print(f"⚠️  VIDEO_DETECTOR=dnn but {prototxt.name} / {model.name} "
+                  f"are missing - using FaceMesh only")
+        return None
+    try:
+        return DnnFaceDetector(str(prototxt), str(model))
+    except cv2.error as e:
+        print(f"⚠️  Could not load the DNN face detector ({e}) - using FaceMesh only")
+        return None
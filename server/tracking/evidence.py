@@ -0,0 +1,86 @@
+"""
+Recent-frame evidence for proctoring events.
+
+When the face leaves the frame or a second face appears, the report used to
+get a count and a duration - nothing a reviewer could look at. Keeping the
+whole video is out of the question, so each camera stream keeps only the last
+few seconds, as the small JPEG copies the video workers return with each
+freshly analysed frame, in a ring bounded by both age and bytes. When an
+event fires, a handful of keyframes from that ring are written next to the
+session's proctoring.json, under a fixed per-session disk budget.
+
+Memory per stream and disk per session are both capped, however long the
+interview runs. Frames the motion gate skipped are not in the ring; they
+looked like the frame before them, which is.
+"""
+
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Deque, List, Optional, Tuple
+
+from config.settings import config
+
+
+# Hard cap on a stream's ring, whatever the age window would allow.
+RING_MAX_BYTES = 256 * 1024
+
+# Keyframes written per event.
+KEYFRAMES = 3
+
+
+class EvidenceBuffer:
+    """The last few seconds of one stream, and its session's evidence on disk."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.directory = config.logs_dir / session_id / "evidence"
+        self.seconds = config.video.evidence_seconds
+        self.budget = config.video.evidence_budget_kb * 1024
+        self._frames: Deque[Tuple[float, bytes]] = deque()
+        self._bytes = 0
+        # A reconnecting camera gets a new buffer; what the session already
+        # wrote still counts against its budget.
+        self.used = sum(
+            p.stat().st_size for p in self.directory.glob("*.jpg")
+        ) if self.directory.exists() else 0
+
+    def add(self, jpeg: bytes, at: Optional[float] = None) -> None:
+        if not jpeg:
+            return
+        at = time.time() if at is None else at
+        self._frames.append((at, jpeg))
+        self._bytes += len(jpeg)
+        while self._frames and (
+            self._bytes > RING_MAX_BYTES or at - self._frames[0][0] > self.seconds
+        ):
+            _, old = self._frames.popleft()
+            self._bytes -= len(old)
+
+    def freeze(self, reason: str) -> List[str]:
+        """
+        Write up to KEYFRAMES frames from the ring - the oldest, the newest,
+        and evenly between - and return their paths relative to the session
+        directory. Blocking; call it off the event loop.
+
+        Frames that would take the session past its budget are not written.
+        """
+        frames = list(self._frames)
+        if not frames or self.used >= self.budget:
+            return []
+        if len(frames) > KEYFRAMES:
+            step = (len(frames) - 1) / (KEYFRAMES - 1)
+            frames = [frames[round(k * step)] for k in range(KEYFRAMES)]
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        for at, jpeg in frames:
+            if self.used + len(jpeg) > self.budget:
+                break
+            stamp = datetime.fromtimestamp(at).strftime("%H%M%S-%f")[:-3]
+            path = self.directory / f"{stamp}_{reason}.jpg"
+            path.write_bytes(jpeg)
+            self.used += len(jpeg)
+            written.append(str(Path("evidence") / path.name))
+        return written
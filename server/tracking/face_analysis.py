@@ -0,0 +1,452 @@
+"""
+Face/eye analysis of a single camera frame.
+
+This is the CPU-heavy half of /ws/video - JPEG decode, colour conversion and
+a MediaPipe FaceMesh pass - and it runs inside a video worker process (see
+tracking/video_pool.py), never on the event loop. Each of those steps is kept
+as small as the question allows: unchanged frames skip them altogether,
+frames are decoded at reduced resolution, a batched first-tier detector (see
+tracking/detectors.py) settles the clear-cut frames, and FaceMesh looks at the
+region around the last known face before falling back to the whole frame. It used to run inline in the
+WebSocket handler, where every camera at 2 fps stalled every Tavus turn,
+control message and REST call on the node.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from config.settings import config
+from tracking import landmarks
+from tracking.detectors import Detection, FaceDetector
+
+
+# The face centre has to sit inside the middle 60% of the frame.
+CENTER_MARGIN = 0.20
+
+# Width, in pixels, that a frame is decoded down towards before face tracking.
+# FaceMesh runs its detector at 128x128 and its landmark model at 192x192, so
+# detail beyond this is decoded only to be thrown away.
+ANALYSIS_WIDTH = 320
+
+# The region of interest is the last face box grown by this fraction of its
+# size on every side, so ordinary head movement stays inside it.
+ROI_PADDING = 0.6
+
+# Evidence keyframes: enough to see who is in shot and where they are looking,
+# at a few KB each.
+EVIDENCE_WIDTH = 240
+EVIDENCE_QUALITY = 60
+
+# Motion-gate thumbnail size. Small enough that comparing two costs nothing
+# next to inference, large enough that a head leaving the frame moves it.
+THUMBNAIL_SIZE = (32, 24)
+
+
+def create_face_mesh(light: bool = False, static: bool = False):
+    """
+    One FaceMesh graph. Stateful unless `static`: it tracks across the
+    frames it is fed, which is only right if they all share one geometry.
+
+    `light` is the device-check graph: one face and no iris refinement, which
+    skips the attention model. It can still tell whether a face is centred
+    and the eyes open, which is all a camera check needs.
+    """
+    return mp.solutions.face_mesh.FaceMesh(
+        static_image_mode=static,
+        # Two, so a second person in shot is noticed; tracking the second
+        # face only costs anything when there is one.
+        max_num_faces=1 if light else 2,
+        refine_landmarks=not light,
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5
+    )
+
+
+class StreamTracker:
+    """
+    One camera stream's analysis state: its FaceMesh graphs, plus the motion
+    gate's memory of the last frame that was actually analysed.
+
+    There are two graphs because FaceMesh tracks in the coordinates of the
+    image it is fed. `mesh` only ever sees crops of the current window, and
+    is reset whenever the window moves; `search_mesh` takes the occasional
+    whole frame, and is static - a full search should find what is there
+    now, not carry a face over from a crop of a different size.
+
+    A seated candidate sends a long run of near-identical frames, and running
+    face tracking on each of them re-derives the same verdict at full cost.
+    The gate compares a tiny greyscale thumbnail of each frame with the one
+    from the last full inference; while the mean change stays under
+    VIDEO_MOTION_THRESHOLD the previous verdict stands. The comparison is
+    against that reference rather than the previous frame, so a slow drift
+    still adds up to a re-check, and VIDEO_FULL_CHECK_SECONDS bounds how long
+    any verdict can go without one.
+    """
+
+    def __init__(self, light: bool = False):
+        self.mesh = create_face_mesh(light)
+        self.search_mesh = create_face_mesh(light, static=True)
+        self.reference: Optional[np.ndarray] = None
+        self.verdict: Optional[Dict[str, Any]] = None
+        self.verified_at = 0.0
+        # When FaceMesh last looked at this stream, and whether the candidate
+        # was looking away then. The detector tier cannot see gaze, so its
+        # verdicts carry this forward until FaceMesh looks again.
+        self.meshed_at = 0.0
+        self.looking_away = False
+        # When FaceMesh last searched the whole frame rather than the ROI.
+        self.searched_at = 0.0
+        # Where to look first, as fractions of the frame (x0, y0, x1, y1):
+        # the last face box, padded. None means search the whole frame.
+        self.roi: Optional[Tuple[float, float, float, float]] = None
+        # The candidate's face box when last seen, to tell it from anyone
+        # else in shot.
+        self.box: Optional[Tuple[float, float, float, float]] = None
+
+    def move_roi(self, roi: Optional[Tuple[float, float, float, float]]) -> None:
+        """Set the window; a different one starts the crop graph afresh."""
+        if roi != self.roi:
+            _reset(self.mesh)
+        self.roi = roi
+
+    def reset(self) -> None:
+        """Forget the face and the scene, so the next user starts clean."""
+        _reset(self.mesh)
+        _reset(self.search_mesh)
+        self.reference = None
+        self.verdict = None
+        self.verified_at = 0.0
+        self.meshed_at = 0.0
+        self.looking_away = False
+        self.searched_at = 0.0
+        self.roi = None
+        self.box = None
+
+    def unchanged(self, thumbnail: np.ndarray) -> bool:
+        threshold = config.video.motion_threshold
+        if threshold <= 0 or self.reference is None or self.verdict is None:
+            return False
+        if time.monotonic() - self.verified_at >= config.video.full_check_seconds:
+            return False
+        change = np.mean(np.abs(thumbnail - self.reference))
+        return change < threshold
+
+    def remember(self, thumbnail: np.ndarray, verdict: Dict[str, Any]) -> None:
+        self.reference = thumbnail
+        self.verdict = verdict
+        self.verified_at = time.monotonic()
+
+
+class TrackerPool:
+    """
+    Stream trackers leased to camera streams, at most `cap` at a time.
+
+    A FaceMesh graph is stateful: with min_tracking_confidence it follows the
+    face it found in the previous frame instead of searching the whole image
+    again, which is far cheaper. One graph shared by every session - as it
+    used to be - saw interleaved frames from different candidates, lost the
+    face on nearly every frame, and paid for a full detection each time;
+    worse, one stream's tracking state could bleed into another's verdict.
+    Each stream now keeps its own tracker for as long as its socket is open.
+
+    When every tracker is in use, the least recently fed stream loses its
+    tracker to the newcomer; it gets one back (and re-detects) on its next
+    frame.
+    """
+
+    def __init__(self, cap: int, light: bool = False):
+        self.cap = max(1, cap)
+        self.light = light
+        # lease id -> tracker, least recently used first
+        self._leased: "OrderedDict[int, StreamTracker]" = OrderedDict()
+        self._idle: List[StreamTracker] = []
+        self.reclaimed = 0
+
+    def acquire(self, lease_id: int) -> StreamTracker:
+        """The tracker for this lease, assigning one if it has none."""
+        tracker = self._leased.get(lease_id)
+        if tracker is not None:
+            self._leased.move_to_end(lease_id)
+            return tracker
+
+        if self._idle:
+            tracker = self._idle.pop()
+        elif len(self._leased) < self.cap:
+            tracker = StreamTracker(self.light)
+        else:
+            _, tracker = self._leased.popitem(last=False)
+            self.reclaimed += 1
+            tracker.reset()
+
+        self._leased[lease_id] = tracker
+        return tracker
+
+    def release(self, lease_id: int) -> None:
+        """Return a lease's tracker to the idle pool, its state cleared."""
+        tracker = self._leased.pop(lease_id, None)
+        if tracker is not None:
+            tracker.reset()
+            self._idle.append(tracker)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "leased": len(self._leased),
+            "idle": len(self._idle),
+            "reclaimed": self.reclaimed,
+        }
+
+
+def _reset(mesh) -> None:
+    """Forget the face a graph was tracking."""
+    reset = getattr(mesh, "reset", None)
+    if reset is not None:
+        reset()
+
+
+def _decode_mode(thumbnail_width: int) -> int:
+    """
+    The cheapest imdecode flag that still yields at least ANALYSIS_WIDTH.
+
+    The reduced modes make libjpeg scale during the inverse DCT, so a 1280px
+    frame decoded at a quarter size costs roughly a sixteenth as much - and so
+    does the colour conversion that follows. The source width is known from
+    the thumbnail, which was decoded at an eighth.
+    """
+    width = thumbnail_width * 8
+    if width >= ANALYSIS_WIDTH * 4:
+        return cv2.IMREAD_REDUCED_COLOR_4
+    if width >= ANALYSIS_WIDTH * 2:
+        return cv2.IMREAD_REDUCED_COLOR_2
+    return cv2.IMREAD_COLOR
+
+
+def analyze_frames(
+    trackers: TrackerPool,
+    detector: Optional[FaceDetector],
+    jobs: List[Tuple[int, Any]],
+    evidence: bool = True,
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Is each face centred, and are the eyes visible?
+
+    `jobs` is (lease id, encoded JPEG) pairs - typically the latest frame of
+    several streams at once. The JPEG is bytes or any buffer over it; in a
+    worker, a view straight into the shared-memory slot it arrived in.
+
+    Frames the motion gate passes are decoded and, if there is a detector,
+    run through it together as one batch. Frames it is sure about are decided
+    there; the rest go to the stream's own FaceMesh. A light pool (device
+    checks) takes the detector's word for every frame when it has one.
+
+    Returns:
+        One verdict per job, in order: {"face_in_center": bool,
+        "eyes_detected": bool, "looking_away": bool, "faces": int,
+        "reused": bool, "tier": str}, plus "yaw", "pitch" and "gaze" when
+        FaceMesh produced it; or None when the bytes do not decode to an
+        image. With `evidence`, a freshly analysed frame also carries
+        "evidence_jpeg": a small re-encoded copy for the session's evidence
+        buffer (see tracking/evidence.py). Reused frames carry none - they
+        look like the last one that did. "reused" means the
+        frame matched the last analysed one and inherited its verdict.
+    """
+    verdicts: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+    # (job index, tracker, thumbnail, decoded frame) still needing a verdict
+    pending = []
+
+    for i, (lease_id, frame_bytes) in enumerate(jobs):
+        tracker = trackers.acquire(lease_id)
+        np_frame = np.frombuffer(frame_bytes, dtype=np.uint8)
+        # IMREAD_REDUCED_GRAYSCALE_8 lets libjpeg scale down while decoding,
+        # so the motion gate's view of the frame costs a fraction of a full
+        # decode.
+        small = cv2.imdecode(np_frame, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if small is None:
+            continue
+        thumbnail = cv2.resize(small, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+        if tracker.unchanged(thumbnail):
+            verdicts[i] = {**tracker.verdict, "reused": True}
+            continue
+
+        frame = cv2.imdecode(np_frame, _decode_mode(small.shape[1]))
+        if frame is not None:
+            pending.append((i, tracker, thumbnail, frame))
+
+    detections = detector.detect([p[3] for p in pending]) if detector and pending else None
+
+    now = time.monotonic()
+    for k, (i, tracker, thumbnail, frame) in enumerate(pending):
+        verdict = None
+        # FaceMesh still gets a look every VIDEO_FULL_CHECK_SECONDS, so head
+        # pose and gaze are sampled even while the detector is sure.
+        if detections is not None and trackers.light:
+            verdict = _decide(detections[k], light=True)
+        elif detections is not None and now - tracker.meshed_at < config.video.full_check_seconds:
+            verdict = _decide(detections[k])
+            if verdict is None and detections[k] and tracker.roi is None:
+                # Unclear, but the detector knows roughly where the face is:
+                # start FaceMesh there rather than on the whole frame.
+                tracker.move_roi(_pad(detections[k][0].box))
+            elif verdict is not None:
+                verdict["looking_away"] = tracker.looking_away and verdict["faces"] > 0
+        if verdict is None:
+            verdict = {**_infer(tracker, frame), "tier": "facemesh"}
+            tracker.meshed_at = now
+            tracker.looking_away = verdict["looking_away"]
+        tracker.remember(thumbnail, verdict)
+        verdicts[i] = {**verdict, "reused": False}
+        if evidence:
+            verdicts[i]["evidence_jpeg"] = _evidence_jpeg(frame)
+
+    return verdicts
+
+
+def _evidence_jpeg(frame: np.ndarray) -> bytes:
+    """The frame at EVIDENCE_WIDTH, as a low-quality JPEG of a few KB."""
+    h, w = frame.shape[:2]
+    if w > EVIDENCE_WIDTH:
+        frame = cv2.resize(
+            frame, (EVIDENCE_WIDTH, round(h * EVIDENCE_WIDTH / w)), interpolation=cv2.INTER_AREA
+        )
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, EVIDENCE_QUALITY])
+    return encoded.tobytes() if ok else b""
+
+
+def _decide(detections: List[Detection], light: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    A verdict from the detector's boxes alone, or None if the frame needs
+    FaceMesh: a face found with middling confidence, or one so close to the
+    centre margin that a box is too coarse to call it. With `light` the
+    detector always decides.
+    """
+    if not detections:
+        return {"face_in_center": False, "eyes_detected": False, "faces": 0, "tier": "dnn"}
+
+    best = detections[0]
+    x0, y0, x1, y1 = best.box
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    if not light:
+        if best.confidence < config.video.dnn_confidence:
+            return None
+        slack = (x1 - x0) * 0.1
+        if abs(cx - CENTER_MARGIN) < slack or abs(cx - (1 - CENTER_MARGIN)) < slack:
+            return None
+
+    confident = sum(1 for d in detections if d.confidence >= config.video.dnn_confidence)
+    return {
+        "face_in_center": CENTER_MARGIN < cx < 1 - CENTER_MARGIN and 0 < cy < 1,
+        # A confident frontal detection from this model means the eye region
+        # is visible; it does not see eyes as such.
+        "eyes_detected": True,
+        "faces": confident,
+        "tier": "dnn",
+    }
+
+
+def _infer(tracker: StreamTracker, frame: np.ndarray) -> Dict[str, Any]:
+    """
+    FaceMesh on the region around the last face, or the whole frame on a miss.
+
+    The crop window is sticky: it only moves when the face drifts towards its
+    edge. FaceMesh tracks in the coordinates of the image it is given, and a
+    window that shifted every frame would keep knocking it back to detection.
+
+    The whole frame is still searched every VIDEO_FULL_CHECK_SECONDS: a
+    second person stepping into shot would never appear inside the window.
+    """
+    now = time.monotonic()
+    if now - tracker.searched_at >= config.video.full_check_seconds:
+        tracker.move_roi(None)
+
+    if tracker.roi is not None:
+        face = _find_face(tracker.mesh, frame, tracker.roi, tracker.box)
+        if face is not None:
+            tracker.box = face["box"]
+            if not _inside(face["box"], tracker.roi):
+                tracker.move_roi(_pad(face["box"]))
+            return face["verdict"]
+
+    # No window yet, or the face left it: search everything.
+    tracker.searched_at = now
+    face = _find_face(tracker.search_mesh, frame, None, tracker.box)
+    if face is None:
+        tracker.move_roi(None)
+        tracker.box = None
+        return {"face_in_center": False, "eyes_detected": False, "faces": 0, "looking_away": False}
+    tracker.box = face["box"]
+    tracker.move_roi(_pad(face["box"]))
+    return face["verdict"]
+
+
+def _pick_face(faces, origin, scale, frame_size, previous):
+    """
+    The candidate's face among those FaceMesh found. Its order means
+    nothing - with a second person in shot, the first may well be theirs -
+    so take the face overlapping where the candidate's last was, or failing
+    that the largest: whoever is sitting at the screen.
+    """
+    if len(faces) == 1:
+        return faces[0]
+    boxes = [landmarks.outline_box(face, origin, scale, frame_size) for face in faces]
+    if previous is not None:
+        overlaps = [_overlap(box, previous) for box in boxes]
+        if max(overlaps) > 0:
+            return faces[overlaps.index(max(overlaps))]
+    areas = [(box[2] - box[0]) * (box[3] - box[1]) for box in boxes]
+    return faces[areas.index(max(areas))]
+
+
+def _overlap(a, b) -> float:
+    """Area shared by two (x0, y0, x1, y1) boxes."""
+    width = min(a[2], b[2]) - max(a[0], b[0])
+    height = min(a[3], b[3]) - max(a[1], b[1])
+    return max(0.0, width) * max(0.0, height)
+
+
+def _find_face(face_mesh, frame: np.ndarray, roi, previous=None) -> Optional[Dict[str, Any]]:
+    """
+    Run FaceMesh on `frame`, cropped to `roi` if given. Landmarks are mapped
+    back to whole-frame fractions, so the verdict is the same either way.
+    `previous` is the candidate's last face box, to pick them out of several.
+    """
+    h, w, _ = frame.shape
+    if roi is None:
+        x0, y0, x1, y1 = 0, 0, w, h
+    else:
+        x0, y0 = int(roi[0] * w), int(roi[1] * h)
+        x1, y1 = int(roi[2] * w), int(roi[3] * h)
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            return None
+
+    crop = frame[y0:y1, x0:x1]
+    rgb_frame = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+    results = face_mesh.process(rgb_frame)
+    if not results.multi_face_landmarks:
+        return None
+
+    origin, scale = (x0, y0), (x1 - x0, y1 - y0)
+    candidate = _pick_face(results.multi_face_landmarks, origin, scale, (w, h), previous)
+
+    # One small array of the landmarks measured, in whole-frame pixels;
+    # every measurement below is read off it (see tracking/landmarks.py).
+    points = landmarks.to_array(candidate, origin=origin, scale=scale)
+    face = landmarks.measure(points, (w, h))
+
+    cx, cy = face["centre"]
+    return {
+        "verdict": {
+            "face_in_center": CENTER_MARGIN < cx < 1 - CENTER_MARGIN and 0 < cy < 1,
+            "eyes_detected": face["eyes_visible"],
+            "faces": len(results.multi_face_landmarks),
+            "looking_away": face["looking_away"],
+            "yaw": face["yaw"],
+            "pitch": face["pitch"],
+            "gaze": face["gaze"],
+        },
+        "box": face["box"],
+    }
@@ -0,0 +1,88 @@
+"""
+Latest-frame-wins hand-off between a /ws/video socket and its analysis loop.
+
+The browser sends frames on a fixed timer whether or not the server has kept
+up. Handled in arrival order, a backlog builds in the socket buffer whenever
+inference falls behind, and the "face in frame" feedback the candidate sees
+drifts further and further behind what the camera is showing. Worse, the
+server then spends its scarce CPU analysing frames that no longer matter.
+
+A FrameMailbox holds at most one frame. The socket reader drops each new frame
+into it, replacing whatever was still waiting; the analysis loop takes the
+newest frame whenever it is ready for another. Superseded frames are discarded
+as raw bytes, before anything is spent decoding them, so under CPU pressure
+the server does less work and stays current instead of doing all of it late.
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+
+class FrameStats:
+    """Frame counters across every camera stream since startup."""
+
+    def __init__(self):
+        self.received = 0
+        self.dropped = 0
+        self.analysed = 0
+        # Analysed frames the motion gate found unchanged, so they reused the
+        # previous verdict instead of running face tracking.
+        self.reused = 0
+        # Fresh verdicts by the tier that decided them ("dnn", "facemesh").
+        self.tiers: Dict[str, int] = {}
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "dropped": self.dropped,
+            "analysed": self.analysed,
+            "reused": self.reused,
+            "tiers": dict(self.tiers),
+            "drop_rate": round(self.dropped / self.received, 3) if self.received else 0.0,
+        }
+
+
+# Process-wide totals, reported by GET /api/metrics/video.
+frame_stats = FrameStats()
+
+
+class FrameMailbox:
+    """A one-slot mailbox for a single camera stream."""
+
+    def __init__(self, stats: Optional[FrameStats] = None):
+        self._frame: Optional[bytes] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._stats = stats or frame_stats
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, frame_bytes: bytes) -> None:
+        """Offer a frame, discarding any that has not been picked up yet."""
+        if self._frame is not None:
+            self.dropped += 1
+            self._stats.dropped += 1
+        self._frame = frame_bytes
+        self.received += 1
+        self._stats.received += 1
+        self._ready.set()
+
+    async def get(self) -> Optional[bytes]:
+        """The newest frame, waiting for one if need be. None once closed."""
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        frame, self._frame = self._frame, None
+        self._stats.analysed += 1
+        return frame
+
+    def close(self) -> None:
+        """No more frames are coming. A frame still waiting is discarded."""
+        if self._frame is not None:
+            self.dropped += 1
+            self._stats.dropped += 1
+            self._frame = None
+        self._closed = True
+        self._ready.set()
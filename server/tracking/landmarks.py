@@ -0,0 +1,193 @@
+"""
+Face geometry from a FaceMesh result, computed on arrays.
+
+The old check built Python lists of eye-corner points per frame and then set
+eyes_detected whenever both lists had two entries - which they always did, so
+"eyes detected" meant nothing beyond "a face was found". Here the landmarks
+the measurements use - the face outline, nose, eyes and irises, about fifty
+of the 478 - are converted to one small array, and everything is read off it
+with array operations:
+
+- the face box and centre;
+- eye openness, from lid gap over eye width, so closed or hidden eyes count
+  as not visible;
+- head yaw and pitch, from the depth difference across the face;
+- gaze, from where each iris sits between its eye corners and lids.
+
+Together these make "looking away from the screen" a real signal, from the
+same FaceMesh pass that was already being paid for.
+
+Coordinates are in whole-frame pixels so that angles are not skewed by the
+frame's aspect ratio.
+"""
+
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+
+# Landmark indices (MediaPipe FaceMesh, refine_landmarks=True). "First" and
+# "second" eye are image-left and image-right.
+NOSE_TIP = 1
+FOREHEAD = 10
+CHIN = 152
+FACE_LEFT_EDGE = 234
+FACE_RIGHT_EDGE = 454
+
+# The face's extremes, enough for a rough box without converting the rest.
+OUTLINE = (FOREHEAD, CHIN, FACE_LEFT_EDGE, FACE_RIGHT_EDGE)
+
+# outer corner, inner corner, upper lid, lower lid, iris centre
+FIRST_EYE = np.array([33, 133, 159, 145, 468])
+SECOND_EYE = np.array([263, 362, 386, 374, 473])
+
+# The silhouette (FaceMesh's FACE_OVAL): its extremes are the mesh's, so the
+# face box needs no other landmark.
+FACE_OVAL = np.array([
+    10, 338, 297, 332, 284, 251, 389, 356, 454, 323, 361, 288,
+    397, 365, 379, 378, 400, 377, 152, 148, 176, 149, 150, 136,
+    172, 58, 132, 93, 234, 127, 162, 21, 54, 103, 67, 109,
+])
+
+# Every landmark measure() reads, irises last: without refine_landmarks
+# there are none, and to_array simply stops short of them. Converting only
+# these keeps the per-frame Python loop to a tenth of the full list.
+USED = np.array(
+    sorted(
+        set(FACE_OVAL.tolist())
+        | {NOSE_TIP, FOREHEAD, CHIN, FACE_LEFT_EDGE, FACE_RIGHT_EDGE}
+        | set(FIRST_EYE[:4].tolist()) | set(SECOND_EYE[:4].tolist())
+    )
+    + [int(FIRST_EYE[4]), int(SECOND_EYE[4])]
+)
+_USED_INDICES = tuple(int(index) for index in USED)
+_ROW = {index: row for row, index in enumerate(_USED_INDICES)}
+
+
+def _rows(indices) -> np.ndarray:
+    """Rows of a to_array() result holding these landmark indices."""
+    return np.array([_ROW[int(i)] for i in np.atleast_1d(indices)])
+
+
+OVAL_ROWS = _rows(FACE_OVAL)
+FIRST_EYE_ROWS = _rows(FIRST_EYE)
+SECOND_EYE_ROWS = _rows(SECOND_EYE)
+
+# Lid gap over eye width below which an eye counts as closed.
+EYE_OPEN_RATIO = 0.12
+
+# Beyond these the candidate is treated as looking away from the screen.
+MAX_YAW_DEGREES = 30.0
+MAX_PITCH_DEGREES = 25.0
+# Iris offset from the middle of the eye, as a fraction of the eye's width.
+MAX_GAZE_OFFSET = 0.22
+
+# Neutral pitch is not zero: with the camera above the screen, a candidate
+# reading it looks slightly down, and the forehead-chin line leans to match.
+NEUTRAL_PITCH_DEGREES = -10.0
+
+
+def to_array(face_landmarks, origin: Tuple[float, float], scale: Tuple[float, float]) -> np.ndarray:
+    """
+    The USED landmarks, in that order, as a float32 array of whole-frame
+    pixels - one row each, less the last two when there are no irises.
+
+    `origin` and `scale` map the coordinates FaceMesh reports - fractions of
+    the (possibly cropped) image it was given - into the full frame: pixel =
+    origin + fraction * scale. z shares x's scale, as FaceMesh defines it.
+    """
+    points = face_landmarks.landmark
+    indices = _USED_INDICES if len(points) > _USED_INDICES[-1] else _USED_INDICES[:-2]
+    flat = np.fromiter(
+        (v for i in indices for p in (points[i],) for v in (p.x, p.y, p.z)),
+        dtype=np.float32,
+        count=len(indices) * 3,
+    )
+    array = flat.reshape(-1, 3)
+    array[:, 0] = origin[0] + array[:, 0] * scale[0]
+    array[:, 1] = origin[1] + array[:, 1] * scale[1]
+    array[:, 2] = array[:, 2] * scale[0]
+    return array
+
+
+def outline_box(
+    face_landmarks, origin: Tuple[float, float], scale: Tuple[float, float],
+    frame_size: Tuple[int, int],
+) -> Tuple[float, float, float, float]:
+    """
+    A rough face box, as fractions of the frame, from the OUTLINE landmarks
+    alone - for telling faces apart before measuring one of them.
+    """
+    w, h = frame_size
+    points = [face_landmarks.landmark[i] for i in OUTLINE]
+    xs = [(origin[0] + p.x * scale[0]) / w for p in points]
+    ys = [(origin[1] + p.y * scale[1]) / h for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def measure(points: np.ndarray, frame_size: Tuple[int, int]) -> Dict[str, Any]:
+    """
+    Face geometry for one face, from its to_array() points.
+
+    Returns:
+        centre and box as fractions of the frame, eye openness per eye,
+        yaw / pitch in degrees, horizontal / vertical gaze offset, and the
+        derived eyes_visible and looking_away flags.
+    """
+    w, h = frame_size
+    xy = points[OVAL_ROWS, :2]
+    lo, hi = xy.min(axis=0), xy.max(axis=0)
+    nose = points[_ROW[NOSE_TIP]]
+
+    if len(points) == len(USED):
+        eyes = np.stack([points[FIRST_EYE_ROWS], points[SECOND_EYE_ROWS]])  # (2, 5, 3)
+    else:
+        # No iris landmarks (refine_landmarks off): stand the eye's centre in
+        # for the iris, which reads as looking straight ahead.
+        eyes = np.stack([points[FIRST_EYE_ROWS[:4]], points[SECOND_EYE_ROWS[:4]]])
+        eyes = np.concatenate([eyes, eyes[:, :2].mean(axis=1, keepdims=True)], axis=1)
+    outer, inner, upper, lower, iris = (eyes[:, i, :2] for i in range(5))
+    width = np.linalg.norm(outer - inner, axis=1)
+    width = np.maximum(width, 1e-6)
+    openness = np.linalg.norm(upper - lower, axis=1) / width
+
+    # Where the iris sits along each eye (0 = outer corner, 1 = inner) and
+    # between its lids (0 = upper, 1 = lower); 0.5 is straight ahead.
+    along = outer - inner
+    horizontal = np.sum((iris - outer) * -along, axis=1) / (width ** 2)
+    lid_gap = np.maximum(lower[:, 1] - upper[:, 1], 1e-6)
+    vertical = (iris[:, 1] - upper[:, 1]) / lid_gap
+    # The eyes mirror each other horizontally: an iris near its inner corner
+    # in one eye is near its outer corner in the other.
+    gaze_x = float(np.mean((horizontal - 0.5) * np.array([1.0, -1.0])))
+    gaze_y = float(np.mean(vertical - 0.5))
+
+    left_edge, right_edge = points[_ROW[FACE_LEFT_EDGE]], points[_ROW[FACE_RIGHT_EDGE]]
+    yaw = float(np.degrees(np.arctan2(
+        right_edge[2] - left_edge[2], right_edge[0] - left_edge[0]
+    )))
+    top, bottom = points[_ROW[FOREHEAD]], points[_ROW[CHIN]]
+    pitch = float(np.degrees(np.arctan2(
+        top[2] - bottom[2], bottom[1] - top[1]
+    ))) - NEUTRAL_PITCH_DEGREES
+
+    on_frame = bool(np.all((eyes[:, :, 0] >= 0) & (eyes[:, :, 0] < w)
+                           & (eyes[:, :, 1] >= 0) & (eyes[:, :, 1] < h)))
+    eyes_visible = on_frame and bool(np.max(openness) >= EYE_OPEN_RATIO)
+
+    looking_away = (
+        abs(yaw) > MAX_YAW_DEGREES
+        or abs(pitch) > MAX_PITCH_DEGREES
+        or (eyes_visible and abs(gaze_x) > MAX_GAZE_OFFSET)
+    )
+
+    return {
+        "centre": (float(nose[0] / w), float(nose[1] / h)),
+        "box": (float(lo[0] / w), float(lo[1] / h), float(hi[0] / w), float(hi[1] / h)),
+        "eye_openness": [round(float(v), 3) for v in openness],
+        "yaw": round(yaw, 1),
+        "pitch": round(pitch, 1),
+        "gaze": (round(gaze_x, 3), round(gaze_y, 3)),
+        "eyes_visible": eyes_visible,
+        "looking_away": looking_away,
+    }
@@ -0,0 +1,133 @@
+"""
+Buffered, rotating JSONL writer for tracking output.
+
+Tracking records used to be written with a synchronous open-append-close per
+record, on the event loop, into one file shared by every session and never
+rotated. On a busy node that is file-system contention in the hot path and a
+file that only ever grows.
+
+Here a write is an append to an in-memory buffer, keyed by destination file.
+A background thread flushes every buffer on a timer, or sooner once enough
+has accumulated, so each file gets one open and one write per batch however
+many streams are feeding it. A file that passes the size limit is renamed
+aside and gzipped by the same thread, and only the newest few are kept.
+Nothing here ever blocks the event loop on disk.
+"""
+
+import gzip
+import json
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.settings import config
+
+
+class BufferedJsonlWriter:
+    """JSON lines in, batched appends to disk out."""
+
+    def __init__(
+        self,
+        flush_seconds: Optional[float] = None,
+        flush_bytes: int = 64 * 1024,
+        rotate_bytes: Optional[int] = None,
+        backups: Optional[int] = None,
+        name: str = "tracking-log",
+    ):
+        video = config.video
+        self.flush_seconds = video.log_flush_seconds if flush_seconds is None else flush_seconds
+        self.flush_bytes = flush_bytes
+        self.rotate_bytes = video.log_rotate_mb * 1024 * 1024 if rotate_bytes is None else rotate_bytes
+        self.backups = video.log_backups if backups is None else backups
+        self.name = name
+
+        self._lock = threading.Lock()
+        # Held across a whole flush, so two flushes of the same file (the
+        # thread's and an explicit flush()) cannot reorder its lines.
+        self._flush_lock = threading.Lock()
+        self._buffers: Dict[Path, List[str]] = {}
+        self._buffered_bytes = 0
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- lifecycle ------------------------------------------------------
+
+    def start(self) -> None:
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Flush whatever is buffered and stop the writer thread."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        # Anything written after the thread's last pass, or with no thread.
+        self._flush()
+
+    # ---- writing --------------------------------------------------------
+
+    def write(self, path: Path, record: Dict[str, Any]) -> None:
+        """Queue one record for `path`. Never touches the disk."""
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._buffers.setdefault(Path(path), []).append(line)
+            self._buffered_bytes += len(line)
+            full = self._buffered_bytes >= self.flush_bytes
+        if full:
+            self._wake.set()
+
+    def flush(self) -> None:
+        """
+        Write everything queued so far, now, on the calling thread. For a
+        reader about to open one of the files; blocking, so call it off the
+        event loop.
+        """
+        self._flush()
+
+    # ---- the writer thread ----------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self._flush()
+
+    def _flush(self) -> None:
+        with self._flush_lock:
+            with self._lock:
+                buffers, self._buffers = self._buffers, {}
+                self._buffered_bytes = 0
+            self._write(buffers)
+
+    def _write(self, buffers: Dict[Path, List[str]]) -> None:
+        for path, lines in buffers.items():
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Explicit encoding: Windows would otherwise write cp1252 and
+                # choke on any non-ASCII content.
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+                    size = f.tell()
+                if self.rotate_bytes > 0 and size >= self.rotate_bytes:
+                    self._rotate(path)
+            except OSError as e:
+                print(f"⚠️  {self.name}: could not write {path}: {e}")
+
+    def _rotate(self, path: Path) -> None:
+        """Move a full file aside as <name>.<timestamp>.jsonl.gz."""
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        rotated = path.with_name(f"{path.stem}.{stamp}{path.suffix}")
+        path.replace(rotated)
+        with open(rotated, "rb") as src, gzip.open(f"{rotated}.gz", "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        rotated.unlink()
+
+        old = sorted(path.parent.glob(f"{path.stem}.*{path.suffix}.gz"))
+        for stale in old[:-self.backups] if self.backups > 0 else old:
+            stale.unlink(missing_ok=True)
@@ -0,0 +1,184 @@
+"""
+One WebSocket per interview, carrying every live channel.
+
+A live interview used to hold two sockets open - /ws/video for camera frames
+and /ws/{session_id} for control - and fire a separate HTTP request for each
+batch of integrity events and each code submission. /ws/interview/{id}
+carries all of them on one connection with a one-byte framing:
+
+    [channel: 1 byte][payload]
+
+    0  control  UTF-8 JSON, both ways (questions, replies, capture settings)
+    1  video    client -> server: one JPEG frame
+                server -> client: UTF-8 verdict ("face_in_frame" / ...)
+    2  events   client -> server: UTF-8 JSON batch, as /api/interview/events
+    3  code     UTF-8 JSON, both ways: submissions, editor revisions
+                ({"type": "revision", ...} as /api/interview/code/revision)
+                and their receipts
+
+Backpressure is per channel, so a flood on one cannot starve another.
+Inbound, video is latest-frame-wins (see frame_mailbox.py) and every other
+channel has a small bounded queue whose overflow is dropped and counted.
+Outbound, each channel has its own bounded buffer and one writer drains
+control first, so a burst of verdicts never delays the next question.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple, Union
+
+CONTROL = 0
+VIDEO = 1
+EVENTS = 2
+CODE = 3
+
+CHANNEL_NAMES = {CONTROL: "control", VIDEO: "video", EVENTS: "events", CODE: "code"}
+
+# Outbound messages buffered per channel before the oldest is dropped. Only
+# reached when the client has stopped reading.
+OUTBOUND_LIMITS = {CONTROL: 64, VIDEO: 4, EVENTS: 8, CODE: 16}
+
+# How long close() keeps writing what is still buffered before giving up on
+# a client that has stopped reading.
+CLOSE_DRAIN_SECONDS = 2.0
+
+
+Payload = Union[bytes, str, Dict[str, Any]]
+
+
+def encode(channel: int, payload: Payload) -> bytes:
+    """One frame: the channel byte, then the payload (str and dict as UTF-8)."""
+    if isinstance(payload, dict):
+        payload = json.dumps(payload)
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return bytes((channel,)) + payload
+
+
+def decode(message: bytes) -> Tuple[int, bytes]:
+    """The channel and payload of one frame. Raises ValueError if empty."""
+    if not message:
+        raise ValueError("empty frame")
+    return message[0], message[1:]
+
+
+class ChannelQueue:
+    """
+    A bounded inbound queue for one channel. put() never waits: when the
+    consumer is behind, the new message is dropped and counted.
+    """
+
+    def __init__(self, maxsize: int):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, payload: bytes) -> bool:
+        try:
+            self._queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    def close(self) -> None:
+        """Wake the consumer with None; it should stop."""
+        try:
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            # Make room: a closing channel's backlog is not going anywhere.
+            self._queue.get_nowait()
+            self._queue.put_nowait(None)
+
+    async def get(self) -> Optional[bytes]:
+        return await self._queue.get()
+
+
+class MuxSender:
+    """
+    Outbound side of a multiplexed socket: send() buffers without waiting,
+    and one task writes frames to the socket, control channel first.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._buffers: Dict[int, Deque[bytes]] = {
+            channel: deque(maxlen=limit) for channel, limit in OUTBOUND_LIMITS.items()
+        }
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.closed = False
+        self.dropped = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def send(self, channel: int, payload: Payload) -> None:
+        buffer = self._buffers[channel]
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1
+        buffer.append(encode(channel, payload))
+        self._ready.set()
+
+    async def close(self) -> None:
+        """
+        Stop accepting frames and write out whatever is still buffered - the
+        reply to the last message, say - before the socket goes.
+        """
+        self.closed = True
+        self._ready.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, CLOSE_DRAIN_SECONDS)
+        except asyncio.TimeoutError:
+            print(f"Multiplexed send: gave up draining {self.pending()} frame(s) on close")
+        except Exception:
+            # _run reports its own failures.
+            pass
+
+    def pending(self) -> int:
+        return sum(len(buffer) for buffer in self._buffers.values())
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                self._ready.clear()
+                # Channels in id order: control (0) always goes first.
+                for channel in sorted(self._buffers):
+                    buffer = self._buffers[channel]
+                    while buffer:
+                        await self.websocket.send_bytes(buffer.popleft())
+                # Checked only once the buffers are empty, so a close never
+                # strands frames queued before it.
+                if self.closed and not self.pending():
+                    return
+        except Exception as e:
+            # The socket is gone; the reader side notices and tears down.
+            print(f"Multiplexed send stopped: {e}")
+            self.closed = True
+
+    def channel(self, channel: int) -> "MuxChannel":
+        return MuxChannel(self, channel)
+
+
+class MuxChannel:
+    """
+    One channel of a MuxSender, with the send_json of a WebSocket - so code
+    that pushes to session["control_ws"] works unchanged over the mux.
+    """
+
+    def __init__(self, sender: MuxSender, channel: int):
+        self.sender = sender
+        self.number = channel
+
+    async def send_json(self, payload: Dict[str, Any]) -> None:
+        if self.sender.closed:
+            raise RuntimeError("multiplexed socket closed")
+        self.sender.send(self.number, payload)
+
+    async def send_text(self, text: str) -> None:
+        if self.sender.closed:
+            raise RuntimeError("multiplexed socket closed")
+        self.sender.send(self.number, text)
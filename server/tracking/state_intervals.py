@@ -0,0 +1,73 @@
+"""
+Run-length encoding of a camera stream's face-tracking state.
+
+A verdict arrives for every analysed frame, but the state behind it - in view
+or not - changes a handful of times in an hour. Recording (state, start, end)
+runs instead of per-frame or per-event lines keeps the full timeline, in view
+as well as out, at a few records per interview. Gaze - on screen or looking
+away - is a second timeline of the same kind, kept only while in view.
+"""
+
+import time
+from typing import NamedTuple, Optional
+
+
+IN_VIEW = "in_view"
+OUT_OF_VIEW = "out_of_view"
+
+# Where an in-view candidate is looking, from head pose and gaze.
+ON_SCREEN = "on_screen"
+LOOKING_AWAY = "looking_away"
+
+
+class Interval(NamedTuple):
+    state: str
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+    def as_record(self) -> dict:
+        return {
+            "state": self.state,
+            "start": round(self.start, 2),
+            "end": round(self.end, 2),
+            "duration": round(self.duration, 2),
+        }
+
+
+class StateIntervals:
+    """The open run for one stream; closed runs are handed back to the caller."""
+
+    def __init__(self):
+        self.state: Optional[str] = None
+        self.since: Optional[float] = None
+
+    def observe(self, state: str, at: Optional[float] = None) -> Optional[Interval]:
+        """
+        Note the state of the latest frame.
+
+        Returns:
+            The run that just ended if the state changed, else None.
+        """
+        at = time.time() if at is None else at
+        if state == self.state:
+            return None
+        closed = self._close(at)
+        self.state = state
+        self.since = at
+        return closed
+
+    def finish(self, at: Optional[float] = None) -> Optional[Interval]:
+        """The stream has ended: close the open run, if any."""
+        closed = self._close(time.time() if at is None else at)
+        self.state = None
+        self.since = None
+        return closed
+
+    def _close(self, at: float) -> Optional[Interval]:
+        if self.state is None:
+            return None
+        return Interval(self.state, self.since, at)
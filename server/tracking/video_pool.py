@@ -0,0 +1,418 @@
+"""
+Video-analysis worker pool.
+
+Face tracking is CPU-bound and the GIL makes threads no help, so frames are
+analysed in separate processes, each holding its own MediaPipe graph. The
+WebSocket handler hands a frame to the pool and awaits the verdict; the event
+loop stays free for the conversational path, and video load spreads across
+cores instead of queueing behind one.
+
+Each worker has its own inbox rather than sharing one queue. That costs a
+little balancing, but it means the parent decides which worker a frame goes
+to - which is what lets a session's frames keep landing on the graph that is
+already tracking its face. A stream takes a TrackerLease when its socket
+opens, pinning it to the least loaded worker, and gives it back on close.
+
+Frames reach a worker through shared memory rather than the queue. Each
+worker owns a ring of fixed-size slots; the parent copies the encoded frame
+into a free slot and sends only (slot, length), and the worker decodes
+straight out of the slot. Pickling a few hundred KB per frame through a pipe
+was its own bottleneck once inference left the event loop - this way the
+per-frame IPC is a few small integers however many cameras are connected. A
+frame too big for a slot, or arriving when every slot is busy, falls back to
+travelling through the queue as before.
+
+VIDEO_WORKERS=0 analyses on a thread in this process instead: no isolation
+from the GIL, but still off the event loop, for platforms where spawning
+processes is not an option.
+"""
+
+import asyncio
+import itertools
+import multiprocessing
+import queue
+import signal
+import threading
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config.settings import config
+
+
+def _worker_main(
+    index: int, inbox, results, trackers_per_worker: int, ring_spec, light: bool
+) -> None:
+    """Worker process: analyse frames until told to stop."""
+    # Ctrl+C reaches the whole process group. The parent shuts workers down
+    # in order; a KeyboardInterrupt traceback from each of them is just noise.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Imported here, not at module level: the parent never needs MediaPipe
+    # when every frame goes to a worker.
+    import numpy as np
+    from tracking.detectors import create_detector
+    from tracking.face_analysis import TrackerPool, analyze_frames
+
+    shm = None
+    if ring_spec:
+        shm_name, slot_bytes = ring_spec
+        # Attach only; the parent created the segment and unlinks it.
+        shm = shared_memory.SharedMemory(name=shm_name)
+
+    trackers = TrackerPool(trackers_per_worker, light)
+    detector = create_detector()
+    batch_max = max(1, config.video.batch_max)
+
+    stopping = False
+    while not stopping:
+        # Block for one job, then take whatever else is already waiting: the
+        # latest frames of the other streams pinned here go through the
+        # detector together.
+        pending = [inbox.get()]
+        while len(pending) < batch_max:
+            try:
+                pending.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+
+        frames = []
+        for job in pending:
+            if job is None:
+                stopping = True
+            elif job[0] == "release":
+                trackers.release(job[1])
+            elif job[0] == "slot":
+                _, job_id, lease_id, slot, length = job
+                view = np.frombuffer(shm.buf, dtype=np.uint8, count=length, offset=slot * slot_bytes)
+                frames.append((job_id, lease_id, view))
+            else:
+                _, job_id, lease_id, frame_bytes = job
+                frames.append((job_id, lease_id, frame_bytes))
+        if not frames:
+            continue
+
+        try:
+            verdicts = analyze_frames(
+                trackers, detector, [(lease_id, data) for _, lease_id, data in frames],
+                evidence=not light,
+            )
+        except Exception as e:
+            print(f"Video worker {index}: batch of {len(frames)} failed: {e}")
+            verdicts = [None] * len(frames)
+        job_ids = [job_id for job_id, _, _ in frames]
+        # Drop the views before answering: once the parent hears back, a
+        # slot is free to be overwritten.
+        del frames
+        for job_id, verdict in zip(job_ids, verdicts):
+            results.put((job_id, index, verdict))
+
+    if shm is not None:
+        shm.close()
+
+
+class FrameRing:
+    """
+    A worker's shared-memory frame slots, and which of them are free.
+
+    Owned by the parent: it creates and unlinks the segment, hands out slots,
+    and takes them back when the worker's verdict for that frame arrives -
+    not when the caller stops waiting, since a timed-out frame may still be
+    being read.
+    """
+
+    def __init__(self, slots: int, slot_bytes: int):
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        self._free = list(range(slots))
+
+    @property
+    def spec(self) -> Tuple[str, int]:
+        return self.shm.name, self.slot_bytes
+
+    def put(self, frame_bytes: bytes) -> Optional[int]:
+        """Copy a frame into a free slot. None if it does not fit or none is free."""
+        if len(frame_bytes) > self.slot_bytes or not self._free:
+            return None
+        slot = self._free.pop()
+        offset = slot * self.slot_bytes
+        self.shm.buf[offset:offset + len(frame_bytes)] = frame_bytes
+        return slot
+
+    def free(self, slot: int) -> None:
+        self._free.append(slot)
+
+    def close(self) -> None:
+        try:
+            self.shm.close()
+            self.shm.unlink()
+        except (FileNotFoundError, BufferError):
+            pass
+
+
+class TrackerLease:
+    """
+    A camera stream's claim on a tracker, held for the life of its socket.
+
+    Pins the stream to one worker: its tracker lives in that process, so its
+    frames must keep going there for tracking to carry over between frames.
+    """
+
+    def __init__(self, lease_id: int, worker_index: int):
+        self.lease_id = lease_id
+        self.worker_index = worker_index
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.inbox = None
+        self.process = None
+        # Job ids of the frames sent and not yet answered.
+        self.jobs: Set[int] = set()
+        # Streams pinned here.
+        self.leases = 0
+        self.ring: Optional[FrameRing] = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.jobs)
+
+
+class VideoWorkerPool:
+    """Frames in, verdicts out, analysed in worker processes."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        name: str = "video",
+        light: bool = False,
+        trackers_per_worker: Optional[int] = None,
+    ):
+        self.size = config.video.workers if workers is None else max(0, workers)
+        self.name = name
+        # Device-check pools: the cheapest tier, no evidence keyframes.
+        self.light = light
+        self.trackers_per_worker = trackers_per_worker or config.video.trackers_per_worker
+        self._ctx = multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._results = None
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._futures: Dict[int, asyncio.Future] = {}
+        # job id -> the ring slot its frame occupies, until the verdict is in.
+        self._slots: Dict[int, Tuple[FrameRing, int]] = {}
+        self.frames_via_queue = 0
+        self._job_ids = itertools.count()
+        self._lease_ids = itertools.count(1)
+        # Streams holding a lease right now, across all workers.
+        self.open_streams = 0
+
+        # VIDEO_WORKERS=0: the trackers live in this process, driven one frame
+        # at a time - a MediaPipe graph is not safe to use from two threads.
+        self._inline_trackers = None
+        self._inline_detector = None
+        self._inline_lock = threading.Lock()
+
+    # ---- lifecycle ------------------------------------------------------
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if self.size == 0:
+            print(f"🎥 {self.name}: analysing frames in-process (0 workers)")
+            return
+
+        # spawn rather than fork: the parent is running an event loop and
+        # several threads, and a forked copy of those is not safe to use.
+        self._results = self._ctx.Queue()
+        for index in range(self.size):
+            worker = _Worker(index)
+            self._spawn(worker)
+            self._workers.append(worker)
+
+        self._reader = threading.Thread(
+            target=self._read_results, name=f"{self.name}-results", daemon=True
+        )
+        self._reader.start()
+        print(f"🎥 {self.name}: {self.size} worker process(es)")
+
+    def _spawn(self, worker: _Worker) -> None:
+        # A fresh ring each time: after a crash the old worker may have died
+        # holding slots that will never be answered. Its jobs go first, so
+        # nothing is left pointing into the ring being closed.
+        self._abandon(worker)
+        if worker.ring is not None:
+            worker.ring.close()
+        worker.ring = None
+        if config.video.shm_slots > 0:
+            try:
+                worker.ring = FrameRing(config.video.shm_slots, config.video.shm_slot_kb * 1024)
+            except OSError as e:
+                print(f"⚠️  {self.name}: no shared memory ({e}) - frames go through the queue")
+
+        worker.inbox = self._ctx.Queue()
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(
+                worker.index, worker.inbox, self._results,
+                self.trackers_per_worker,
+                worker.ring.spec if worker.ring else None,
+                self.light,
+            ),
+            name=f"{self.name}-worker-{worker.index}",
+            daemon=True,
+        )
+        worker.process.start()
+
+    def _abandon(self, worker: _Worker) -> None:
+        """A dead worker's frames will never be answered: forget their slots
+        and give their callers no verdict now instead of at the timeout."""
+        for job_id in worker.jobs:
+            self._slots.pop(job_id, None)
+            future = self._futures.get(job_id)
+            if future and not future.done():
+                future.set_result(None)
+        worker.jobs.clear()
+
+    def close(self) -> None:
+        for worker in self._workers:
+            try:
+                worker.inbox.put(None)
+            except Exception:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.terminate()
+        if self._results is not None:
+            # Unblocks the reader thread.
+            self._results.put(None)
+        for worker in self._workers:
+            if worker.ring is not None:
+                worker.ring.close()
+        self._workers = []
+        self._slots.clear()
+        for future in self._futures.values():
+            if not future.done():
+                future.set_result(None)
+        self._futures.clear()
+
+    # ---- leases ---------------------------------------------------------
+
+    def lease(self) -> TrackerLease:
+        """Pin a new camera stream to the worker with the fewest streams."""
+        self.open_streams += 1
+        if self.size == 0:
+            return TrackerLease(next(self._lease_ids), -1)
+        self._revive()
+        worker = min(self._workers, key=lambda w: (w.leases, w.in_flight))
+        worker.leases += 1
+        return TrackerLease(next(self._lease_ids), worker.index)
+
+    def release(self, lease: TrackerLease) -> None:
+        """The stream has ended: its tracker goes back to the pool."""
+        self.open_streams = max(0, self.open_streams - 1)
+        if self.size == 0:
+            with self._inline_lock:
+                if self._inline_trackers is not None:
+                    self._inline_trackers.release(lease.lease_id)
+            return
+        if lease.worker_index >= len(self._workers):
+            return
+        worker = self._workers[lease.worker_index]
+        worker.leases = max(0, worker.leases - 1)
+        try:
+            worker.inbox.put(("release", lease.lease_id))
+        except Exception:
+            # Worker already gone; its trackers went with it.
+            pass
+
+    # ---- analysis -------------------------------------------------------
+
+    async def analyze(
+        self, frame_bytes: bytes, lease: TrackerLease
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Analyse one frame with the stream's own tracker. None means no
+        verdict - undecodable, or the worker did not answer in time - and the
+        caller simply skips the frame.
+        """
+        if self.size == 0:
+            return await asyncio.to_thread(self._analyze_inline, frame_bytes, lease)
+
+        self._revive()
+        worker = self._workers[lease.worker_index]
+        job_id = next(self._job_ids)
+        future = self._loop.create_future()
+        self._futures[job_id] = future
+        worker.jobs.add(job_id)
+
+        slot = worker.ring.put(frame_bytes) if worker.ring else None
+        if slot is not None:
+            self._slots[job_id] = (worker.ring, slot)
+            worker.inbox.put(("slot", job_id, lease.lease_id, slot, len(frame_bytes)))
+        else:
+            self.frames_via_queue += 1
+            worker.inbox.put(("frame", job_id, lease.lease_id, frame_bytes))
+
+        try:
+            return await asyncio.wait_for(future, timeout=config.video.frame_timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            self._futures.pop(job_id, None)
+
+    def _revive(self) -> None:
+        """Replace any worker that has died. Its streams keep their leases and
+        simply re-detect on the fresh process."""
+        for worker in self._workers:
+            if not worker.process.is_alive():
+                print(f"⚠️  {self.name} worker {worker.index} died - restarting")
+                self._spawn(worker)
+
+    def _analyze_inline(
+        self, frame_bytes: bytes, lease: TrackerLease
+    ) -> Optional[Dict[str, Any]]:
+        from tracking.detectors import create_detector
+        from tracking.face_analysis import TrackerPool, analyze_frames
+
+        with self._inline_lock:
+            if self._inline_trackers is None:
+                self._inline_trackers = TrackerPool(self.trackers_per_worker, self.light)
+                self._inline_detector = create_detector()
+            return analyze_frames(
+                self._inline_trackers, self._inline_detector,
+                [(lease.lease_id, frame_bytes)],
+                evidence=not self.light,
+            )[0]
+
+    # ---- results --------------------------------------------------------
+
+    def _read_results(self) -> None:
+        """Reader thread: hand each verdict back to the event loop."""
+        while True:
+            try:
+                item = self._results.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._resolve, *item)
+
+    def _resolve(self, job_id: int, index: int, verdict: Optional[Dict[str, Any]]) -> None:
+        if index < len(self._workers):
+            self._workers[index].jobs.discard(job_id)
+        taken = self._slots.pop(job_id, None)
+        if taken:
+            ring, slot = taken
+            ring.free(slot)
+        future = self._futures.get(job_id)
+        if future and not future.done():
+            future.set_result(verdict)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.size,
+            "streams": self.open_streams,
+            "in_flight": sum(w.in_flight for w in self._workers),
+            "frames_via_queue": self.frames_via_queue,
+        }